@@ -1,3 +1,3 @@
-from .utils import extract_text_from_pdf, validate_job_description
+from .utils import extract_text_from_pdf, validate_job_description, hash_job_description
 
-__all__ = ['extract_text_from_pdf', 'validate_job_description']
\ No newline at end of file
+__all__ = ['extract_text_from_pdf', 'validate_job_description', 'hash_job_description']
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+Caching utilities for the resume agent API.
+
+Provides a small in-process LRU cache with per-entry TTL and the two-tier
+job description analysis cache that sits in front of the JD analyzer agent.
+"""
+
+import copy
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from .database import db_service
+
+
+class TTLCache:
+    """
+    In-process LRU cache whose entries expire after a fixed time-to-live.
+
+    Not thread-safe; intended to be used from the event loop only.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry if full."""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class JDAnalysisCache:
+    """
+    Two-tier cache for job description analyses.
+
+    Lookups hit the in-process LRU first and fall back to the shared MongoDB
+    collection, so every worker benefits from an analysis computed by any other.
+    Keys are content hashes of the normalized job description.
+    """
+
+    def __init__(self, local_cache: TTLCache):
+        self.local = local_cache
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[Dict]:
+        """Return a copy of the cached analysis for key, or None on a miss."""
+        analysis = self.local.get(key)
+        if analysis is not None:
+            self.local_hits += 1
+            return copy.deepcopy(analysis)
+
+        try:
+            analysis = await db_service.get_cached_analysis(key)
+        except Exception as e:
+            print(f"JD analysis cache lookup failed: {e}")
+            analysis = None
+
+        if analysis is None:
+            self.misses += 1
+            return None
+
+        self.shared_hits += 1
+        self.local.set(key, analysis)
+        return copy.deepcopy(analysis)
+
+    async def set(self, key: str, analysis: Dict) -> None:
+        """Store a successful analysis in both tiers."""
+        self.local.set(key, copy.deepcopy(analysis))
+        try:
+            await db_service.save_cached_analysis(key, analysis)
+        except Exception as e:
+            print(f"JD analysis cache write failed: {e}")
+
+    def stats(self) -> Dict:
+        lookups = self.local_hits + self.shared_hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": (self.local_hits + self.shared_hits) / lookups if lookups else 0.0,
+            "local_size": len(self.local)
+        }
+
+
+jd_analysis_cache = JDAnalysisCache(
+    TTLCache(
+        maxsize=int(os.getenv("JD_CACHE_MAX_ENTRIES", "1024")),
+        ttl=float(os.getenv("JD_CACHE_TTL_SECONDS", "3600"))
+    )
+)
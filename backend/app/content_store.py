@@ -0,0 +1,190 @@
+"""
+Content-addressed storage for large, frequently repeated values.
+
+Job descriptions, job analyses and extracted resume text are stored once in
+their own collections under the SHA-256 of their content. Workflow result
+documents keep only the hashes (plus the role title and company name, which
+history listings filter and display), and reads hydrate the values back.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from pymongo.errors import BulkWriteError
+
+from .cache import TTLCache
+from .database import db_service
+from .write_buffer import DUPLICATE_KEY_ERROR, WriteBehindBuffer
+
+# Result field -> collection holding its content
+CONTENT_FIELDS = {
+    "job_description": "job_descriptions",
+    "job_analysis": "job_analyses",
+    "resume_text": "resume_texts",
+}
+
+# Fields hydrated when a caller does not ask for specific ones; resume text is large and opt-in
+DEFAULT_HYDRATED_FIELDS = ("job_description", "job_analysis")
+
+
+def content_hash(value: Any) -> str:
+    """SHA-256 of a string, or of the canonical JSON form of any other value."""
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def hash_field(field: str) -> str:
+    return f"{field}_hash"
+
+
+def _project(value: Any, subfields: List[str]) -> Any:
+    """Keep only the requested top-level keys of a dict value (e.g. job_analysis.role_title)."""
+    if not subfields or not isinstance(value, dict):
+        return value
+    keys = {subfield.split(".")[0] for subfield in subfields}
+    return {key: item for key, item in value.items() if key in keys}
+
+
+class ContentStore:
+    """Write-once blob collections keyed by content hash."""
+
+    def __init__(self, database=db_service):
+        self.database = database
+        self.buffers = {
+            field: WriteBehindBuffer(self._inserter(collection), collection, on_written=self._marker(field))
+            for field, collection in CONTENT_FIELDS.items()
+        }
+        # Results reference blobs by hash, so the blobs are always written first
+        database.write_buffer.dependencies.extend(self.buffers.values())
+        # Hashes this process has confirmed are stored, to skip redundant writes
+        self._known = TTLCache(maxsize=10000, ttl=3600)
+
+    def _marker(self, field: str):
+        def mark_written(documents: List[Dict]) -> None:
+            for document in documents:
+                self._known.set((field, document["_id"]), True)
+        return mark_written
+
+    def _inserter(self, collection: str):
+        async def insert_many(documents: List[Dict]) -> None:
+            # Duplicate keys are expected and treated as written by the buffer
+            await self.database.db[collection].insert_many(documents, ordered=False)
+        return insert_many
+
+    async def put(self, field: str, value: Any) -> str:
+        """Store value under its hash (once) and return the hash."""
+        digest = content_hash(value)
+        # Known once its batch is written; until then the queued copy is enough
+        if self._known.get((field, digest)) is None and self.buffers[field].find(digest) is None:
+            await self.buffers[field].add({"_id": digest, "value": value, "created_at": datetime.now(timezone.utc)})
+        return digest
+
+    async def put_many_now(self, field: str, values: Dict[str, Any]) -> Set[str]:
+        """
+        Write values keyed by hash directly, bypassing the buffer.
+
+        Returns:
+            The hashes confirmed to be stored afterwards, whether written now or
+            already present; anything else failed to write
+        """
+        collection = self.database.db[CONTENT_FIELDS[field]]
+        now = datetime.now(timezone.utc)
+        try:
+            await collection.insert_many(
+                [{"_id": digest, "value": value, "created_at": now} for digest, value in values.items()],
+                ordered=False
+            )
+        except BulkWriteError as e:
+            failures = [error for error in e.details.get("writeErrors", []) if error.get("code") != DUPLICATE_KEY_ERROR]
+            if failures:
+                print(f"Content write errors in {CONTENT_FIELDS[field]}: {len(failures)} ({failures[0].get('errmsg')})")
+        confirmed = set()
+        async for doc in collection.find({"_id": {"$in": list(values)}}, {"_id": 1}):
+            confirmed.add(doc["_id"])
+            self._known.set((field, doc["_id"]), True)
+        return confirmed
+
+    async def get_many(self, field: str, digests: Iterable[str]) -> Dict[str, Any]:
+        """Look up values by hash, including ones still waiting to be written."""
+        values = {}
+        missing = []
+        for digest in set(digests):
+            pending = self.buffers[field].find(digest)
+            if pending is not None:
+                values[digest] = pending["value"]
+            else:
+                missing.append(digest)
+        if missing:
+            async for doc in self.database.db[CONTENT_FIELDS[field]].find({"_id": {"$in": missing}}):
+                values[doc["_id"]] = doc["value"]
+        return values
+
+    @staticmethod
+    def listing_fields(document: Dict) -> Dict:
+        """Role title and company name, kept on result documents for history listings."""
+        analysis = document.get("job_analysis")
+        if not isinstance(analysis, dict):
+            return {}
+        return {"role_title": analysis.get("role_title"), "company_name": analysis.get("company_name")}
+
+    async def externalize(self, document: Dict) -> Dict:
+        """Replace content fields in a result document with their hashes, in place."""
+        document.update(self.listing_fields(document))
+        for field in CONTENT_FIELDS:
+            if document.get(field) is not None:
+                document[hash_field(field)] = await self.put(field, document.pop(field))
+        return document
+
+    def stored_fields(self, fields: Optional[List[str]]) -> Optional[List[str]]:
+        """Extend a projection so requested content fields also fetch their hashes."""
+        if not fields:
+            return fields
+        extra = [hash_field(field) for field in CONTENT_FIELDS if any(f.split(".")[0] == field for f in fields)]
+        return list(fields) + extra
+
+    async def hydrate(self, documents: List[Dict], fields: Optional[List[str]] = None) -> List[Dict]:
+        """Fill content fields back in from their hashes, one query per content type."""
+        wanted = DEFAULT_HYDRATED_FIELDS if not fields else [
+            field for field in CONTENT_FIELDS if any(f.split(".")[0] == field for f in fields)
+        ]
+        for field in wanted:
+            key = hash_field(field)
+            digests = [doc[key] for doc in documents if doc.get(key)]
+            if not digests:
+                continue
+            values = await self.get_many(field, digests)
+            # Asking for the whole field wins over asking for some of its keys
+            subfields = [] if fields and field in fields else [
+                f.split(".", 1)[1] for f in fields or [] if f.startswith(field + ".")
+            ]
+            for doc in documents:
+                if doc.get(key) in values:
+                    doc[field] = _project(values[doc[key]], subfields)
+        # Hashes are a storage detail; callers see the same documents as before
+        for doc in documents:
+            for field in CONTENT_FIELDS:
+                doc.pop(hash_field(field), None)
+        return documents
+
+    def start(self) -> None:
+        for buffer in self.buffers.values():
+            buffer.start()
+
+    async def drain(self) -> None:
+        for buffer in self.buffers.values():
+            await buffer.drain()
+
+    def stats(self) -> Dict:
+        return {field: buffer.stats() for field, buffer in self.buffers.items()}
+
+
+content_store = ContentStore()
+
+
+async def save_workflow_result(document: Dict) -> str:
+    """Externalize a result document's content fields and queue it for writing."""
+    await content_store.externalize(document)
+    return await db_service.save_workflow_result(document)
@@ -1,12 +1,50 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from bson import ObjectId
 from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import base64
+import json
 import os
 
+from .write_buffer import WriteBehindBuffer
+
+# Fields returned by history listings unless the caller asks for others
+RESULT_SUMMARY_FIELDS = (
+    "run_id", "timestamp", "status", "resume_filename", "graph_mode", "processing_time_seconds", "degraded", "jd_similarity",
+    "role_title", "company_name", "tailored_resume.match_score", "revision_of", "revision"
+)
+
+# Case-insensitive comparison for role title filters; queries must pass the same collation
+ROLE_TITLE_COLLATION = {"locale": "en", "strength": 2}
+
+def build_projection(fields: List[str]) -> Dict[str, int]:
+    """Inclusion projection for fields, dropping paths already covered by a requested ancestor"""
+    # Mongo rejects overlapping paths such as "tailored_resume" with "tailored_resume.match_score"
+    requested = set(fields)
+    return {
+        field: 1 for field in dict.fromkeys(fields)
+        if not any(".".join(field.split(".")[:depth]) in requested for depth in range(1, field.count(".") + 1))
+    }
+
+def encode_cursor(doc: dict) -> str:
+    """Opaque keyset cursor for the position after doc in (timestamp, _id) descending order"""
+    position = {"timestamp": doc["timestamp"].isoformat(), "id": str(doc["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(position["timestamp"]), ObjectId(position["id"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+
 class DatabaseService:
     def __init__(self):
         self.client = None
         self.db = None
         self.collection = None
+        self.jd_cache = None
+        self.write_buffer = WriteBehindBuffer(self.insert_workflow_results, "workflow_results")
         
     async def connect(self):
         try:
@@ -14,24 +52,133 @@ class DatabaseService:
             self.client = AsyncIOMotorClient(mongo_url)
             self.db = self.client.resume_agent
             self.collection = self.db.workflow_results
+            self.jd_cache = self.db.jd_analysis_cache
             # Test connection
             await self.client.admin.command('ping')
+            # History listings: newest first, optionally filtered, ties broken by _id
+            await self.collection.create_index([("timestamp", -1), ("_id", -1)])
+            await self.collection.create_index([("resume_filename", 1), ("timestamp", -1), ("_id", -1)])
+            await self.collection.create_index(
+                [("role_title", 1), ("timestamp", -1), ("_id", -1)],
+                collation=ROLE_TITLE_COLLATION
+            )
+            # Expire shared cache entries that have not been refreshed
+            await self.jd_cache.create_index(
+                "updated_at",
+                expireAfterSeconds=int(os.getenv("JD_CACHE_MONGO_TTL_SECONDS", str(30 * 24 * 3600)))
+            )
+            # Near-duplicate lookups select candidate postings by LSH band
+            await self.jd_cache.create_index("bands")
+            # Re-queue results spilled by a shutdown while the database was down
+            self.write_buffer.start()
             print("Database connected successfully")
         except Exception as e:
             print(f"Database connection failed: {e}")
             self.client = None
             self.db = None
             self.collection = None
+            self.jd_cache = None
             raise
         
     async def disconnect(self):
+        # Results acknowledged to clients must reach Mongo before the client closes
+        await self.write_buffer.drain()
         if self.client:
             self.client.close()
     
     async def save_workflow_result(self, data: dict) -> str:
-        """Save workflow result to MongoDB"""
+        """Queue a workflow result for a background write and return its id"""
+        data["_id"] = ObjectId()
         data["timestamp"] = datetime.now(timezone.utc)
-        result = await self.collection.insert_one(data)
-        return str(result.inserted_id)
+        await self.write_buffer.add(data)
+        return str(data["_id"])
+    
+    async def insert_workflow_results(self, documents: List[dict]) -> None:
+        """Insert a batch of workflow results, continuing past individual failures"""
+        await self.collection.insert_many(documents, ordered=False)
+    
+    async def list_workflow_results(
+        self,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        resume_filename: Optional[str] = None,
+        role_title: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """List workflow results newest first; returns one page and the cursor for the next"""
+        query: Dict = {}
+        if resume_filename:
+            query["resume_filename"] = resume_filename
+        if role_title:
+            query["role_title"] = role_title
+        if cursor:
+            timestamp, last_id = decode_cursor(cursor)
+            query["$or"] = [
+                {"timestamp": {"$lt": timestamp}},
+                {"timestamp": timestamp, "_id": {"$lt": last_id}}
+            ]
+        
+        projection = build_projection(list(fields or RESULT_SUMMARY_FIELDS) + ["timestamp"])
+        find = self.collection.find(query, projection).sort([("timestamp", -1), ("_id", -1)]).limit(limit + 1)
+        if role_title:
+            find = find.collation(ROLE_TITLE_COLLATION)
+        
+        docs = await find.to_list(length=limit + 1)
+        next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+        return docs[:limit], next_cursor
+    
+    async def get_workflow_result(self, result_id: str, fields: Optional[List[str]] = None) -> Optional[dict]:
+        """Fetch one workflow result by id, including results not yet flushed"""
+        try:
+            object_id = ObjectId(result_id)
+        except Exception:
+            return None
+        projection = build_projection(fields) if fields else None
+        doc = await self.collection.find_one({"_id": object_id}, projection)
+        if doc is None:
+            pending = self.write_buffer.find(object_id)
+            if pending is not None:
+                top_level = {field.split(".")[0] for field in fields or []}
+                doc = {key: value for key, value in pending.items() if not fields or key == "_id" or key in top_level}
+        return doc
+    
+    async def get_cached_analysis(self, key: str) -> Optional[dict]:
+        """Fetch a cached job description analysis by content hash"""
+        if self.jd_cache is None:
+            return None
+        doc = await self.jd_cache.find_one({"_id": key}, {"analysis": 1})
+        return doc.get("analysis") if doc else None
+    
+    async def save_cached_analysis(self, key: str, analysis: dict) -> None:
+        """Upsert a job description analysis into the shared cache"""
+        if self.jd_cache is None:
+            return
+        await self.jd_cache.update_one(
+            {"_id": key},
+            {"$set": {"analysis": analysis, "updated_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+
+    async def save_jd_signature(self, key: str, minhash: List[int], bands: List[str], levels: List[str]) -> None:
+        """Attach a near-duplicate signature to a cached analysis so it expires with it"""
+        if self.jd_cache is None:
+            return
+        await self.jd_cache.update_one({"_id": key}, {"$set": {"minhash": minhash, "bands": bands, "levels": levels}})
+    
+    async def find_jd_signatures(self, bands: List[str], limit: int) -> List[dict]:
+        """Cached analyses sharing at least one LSH band with a posting, most shared bands first"""
+        if self.jd_cache is None:
+            return []
+        # Ranked in the query so the closest candidates survive the limit
+        pipeline = [
+            {"$match": {"bands": {"$in": bands}}},
+            {"$project": {
+                "minhash": 1, "bands": 1, "levels": 1,
+                "shared_bands": {"$size": {"$filter": {"input": "$bands", "cond": {"$in": ["$$this", bands]}}}}
+            }},
+            {"$sort": {"shared_bands": -1}},
+            {"$limit": limit}
+        ]
+        return await self.jd_cache.aggregate(pipeline).to_list(length=limit)
 
-db_service = DatabaseService()
\ No newline at end of file
+db_service = DatabaseService()
@@ -0,0 +1,71 @@
+"""
+Import-time budget check for the API and worker entry points.
+
+Run it in CI or before a release with:
+
+    python -m app.import_budget [--runs 5]
+
+Each module is imported in a fresh interpreter several times; the check fails
+when the median import time exceeds IMPORT_TIME_BUDGET_SECONDS or when a
+module that should only load on first use (LangGraph's graph builder, the
+Gemini client, the agents) was imported eagerly.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+IMPORT_TIME_BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", "1.5"))
+
+ENTRY_POINTS = ("app.main", "app.worker")
+
+# Built by the workflow registry on warm-up or first use, never at import
+DEFERRED_MODULES = (
+    "langgraph.graph",
+    "langchain_google_genai",
+    "app.workflow.graph",
+    "app.workflow.agents",
+)
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {deferred!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str) -> dict:
+    """Import module in a fresh interpreter and report the time and deferred modules it loaded."""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, deferred=DEFERRED_MODULES)],
+        cwd=backend_dir, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def check(runs: int, budget: float = IMPORT_TIME_BUDGET_SECONDS) -> bool:
+    """Print the median import time of each entry point; returns False if any is over budget."""
+    ok = True
+    for module in ENTRY_POINTS:
+        samples = [measure(module) for _ in range(runs)]
+        median = statistics.median(sample["seconds"] for sample in samples)
+        loaded = sorted({name for sample in samples for name in sample["loaded"]})
+        within = median <= budget and not loaded
+        ok = ok and within
+        print(f"{module}: {median:.3f}s median over {runs} runs (budget {budget:.2f}s) {'OK' if within else 'FAIL'}")
+        if loaded:
+            print(f"  imported eagerly: {', '.join(loaded)}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check import time of the API and worker against the budget")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(0 if check(args.runs) else 1)
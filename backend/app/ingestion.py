@@ -0,0 +1,111 @@
+"""
+Bounded-memory ingestion of uploaded resumes.
+
+Uploads are copied chunk by chunk into memory up to a threshold and spilled
+to a temporary file beyond it, hashing as they go, so a request never holds
+more than one chunk plus the threshold in memory and oversized files are
+rejected as soon as the limit is crossed.
+"""
+
+import hashlib
+import os
+import tempfile
+from io import BytesIO
+from typing import Optional, Union
+
+from fastapi import UploadFile
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+SPOOL_THRESHOLD_BYTES = int(os.getenv("SPOOL_THRESHOLD_BYTES", str(1024 * 1024)))
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds MAX_UPLOAD_BYTES."""
+
+
+class SpooledUpload:
+    """An uploaded file kept in memory below the spool threshold and on disk above it."""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.size = 0
+        self.sha256 = ""
+        self._buffer: Optional[BytesIO] = BytesIO()
+        self._file = None
+        self.path: Optional[str] = None
+
+    def _write(self, chunk: bytes, threshold: int) -> None:
+        if self._file is None and self.size + len(chunk) > threshold:
+            self._file = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+            self.path = self._file.name
+            self._file.write(self._buffer.getbuffer())
+            self._buffer = None
+
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            self._buffer.write(chunk)
+        self.size += len(chunk)
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        """PDF content as bytes when held in memory, otherwise the temp file path."""
+        if self.path is not None:
+            return self.path
+        return self._buffer.getvalue()
+
+    def close(self) -> None:
+        """Release the buffer and delete any spooled temp file."""
+        self._buffer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+
+async def spool_upload(
+    upload: UploadFile,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    threshold: int = SPOOL_THRESHOLD_BYTES
+) -> SpooledUpload:
+    """
+    Copy an upload into a SpooledUpload, hashing it and enforcing the size limit.
+
+    Args:
+        upload: Incoming multipart file
+        max_bytes: Maximum accepted size in bytes
+        threshold: Size above which content is spilled to disk
+
+    Returns:
+        SpooledUpload with size and SHA-256 populated
+
+    Raises:
+        UploadTooLargeError: If the upload exceeds max_bytes
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLargeError(f"File too large (maximum {max_bytes // (1024 * 1024)} MB)")
+
+    spooled = SpooledUpload(upload.filename)
+    digest = hashlib.sha256()
+    try:
+        while chunk := await upload.read(CHUNK_SIZE):
+            if spooled.size + len(chunk) > max_bytes:
+                raise UploadTooLargeError(f"File too large (maximum {max_bytes // (1024 * 1024)} MB)")
+            digest.update(chunk)
+            spooled._write(chunk, threshold)
+        if spooled._file is not None:
+            # Close the handle so the extraction worker sees the complete file
+            spooled._file.close()
+            spooled._file = None
+    except Exception:
+        spooled.close()
+        raise
+
+    spooled.sha256 = digest.hexdigest()
+    return spooled
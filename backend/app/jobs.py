@@ -0,0 +1,146 @@
+"""
+Durable job queue backed by MongoDB.
+
+API nodes enqueue pipeline jobs into the jobs collection and return
+immediately; worker processes (app.worker) claim jobs with a renewable
+lease, run them and append every progress event to job_events, from which
+clients stream progress. A job whose worker dies is re-claimed once its
+lease expires.
+"""
+
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+from .database import db_service
+
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_EVENTS_POLL_SECONDS = float(os.getenv("JOB_EVENTS_POLL_SECONDS", "0.5"))
+
+TERMINAL_STATUSES = ("completed", "error", "cancelled")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobQueue:
+    """Enqueue, claim and track pipeline jobs and their progress events."""
+
+    def __init__(self, database=db_service):
+        self.database = database
+
+    @property
+    def jobs(self):
+        return self.database.db.jobs
+
+    @property
+    def events(self):
+        return self.database.db.job_events
+
+    async def setup(self) -> None:
+        """Create the indexes used by claim() and event tailing."""
+        await self.jobs.create_index([("status", 1), ("created_at", 1)])
+        await self.jobs.create_index([("status", 1), ("lease_expires_at", 1)])
+        await self.events.create_index([("job_id", 1), ("seq", 1)], unique=True)
+
+    async def enqueue(self, payload: Dict) -> str:
+        """Store a new job and return its id."""
+        job_id = uuid.uuid4().hex
+        now = _now()
+        await self.jobs.insert_one({
+            "_id": job_id,
+            "status": "queued",
+            "payload": payload,
+            "run_id": uuid.uuid4().hex,
+            "attempts": 0,
+            "created_at": now,
+            "updated_at": now
+        })
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        return await self.jobs.find_one({"_id": job_id}, {"payload": 0})
+
+    async def claim(self, worker_id: str) -> Optional[Dict]:
+        """Atomically take the oldest queued job, or one whose lease has expired."""
+        now = _now()
+        return await self.jobs.find_one_and_update(
+            {"$or": [
+                {"status": "queued"},
+                {"status": "running", "lease_expires_at": {"$lt": now}}
+            ]},
+            {
+                "$set": {
+                    "status": "running",
+                    "worker_id": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=JOB_LEASE_SECONDS),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def renew_lease(self, job_id: str, worker_id: str) -> bool:
+        """Extend the lease; returns False if another worker has taken the job."""
+        now = _now()
+        result = await self.jobs.update_one(
+            {"_id": job_id, "worker_id": worker_id, "status": "running"},
+            {"$set": {"lease_expires_at": now + timedelta(seconds=JOB_LEASE_SECONDS), "updated_at": now}}
+        )
+        return result.matched_count == 1
+
+    async def next_seq(self, job_id: str) -> int:
+        """Return the sequence number for the next event of a job."""
+        last = await self.events.find_one({"job_id": job_id}, {"seq": 1}, sort=[("seq", -1)])
+        return last["seq"] + 1 if last else 1
+
+    async def append_event(self, job_id: str, seq: int, event: Dict) -> None:
+        await self.events.insert_one({"job_id": job_id, "seq": seq, "event": event, "created_at": _now()})
+
+    async def finish(self, job_id: str, worker_id: str, status: str, result: Optional[Dict] = None) -> None:
+        now = _now()
+        await self.jobs.update_one(
+            {"_id": job_id, "worker_id": worker_id},
+            {"$set": {"status": status, "result": result, "finished_at": now, "updated_at": now},
+             "$unset": {"lease_expires_at": ""}}
+        )
+
+    async def iter_events(self, job_id: str, after_seq: int = 0) -> AsyncIterator[Tuple[int, Optional[Dict]]]:
+        """
+        Yield (seq, event) pairs for a job until its terminal event.
+
+        Polls job_events every JOB_EVENTS_POLL_SECONDS while the job is idle;
+        (seq, None) is yielded on each empty poll so callers can send keep-alives.
+        """
+        while True:
+            # Read the status first: if it was already terminal, the events
+            # read below are guaranteed to include everything the worker wrote
+            job = await self.jobs.find_one({"_id": job_id}, {"status": 1})
+            if job is None:
+                return
+
+            found = False
+            cursor = self.events.find({"job_id": job_id, "seq": {"$gt": after_seq}}).sort("seq", 1)
+            async for doc in cursor:
+                found = True
+                after_seq = doc["seq"]
+                yield after_seq, doc["event"]
+                if doc["event"].get("status") in TERMINAL_STATUSES:
+                    return
+
+            if job["status"] in TERMINAL_STATUSES:
+                return
+            if not found:
+                yield after_seq, None
+                await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+
+
+job_queue = JobQueue()
@@ -1,23 +1,51 @@
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse
+from fastapi.encoders import jsonable_encoder
 from contextlib import asynccontextmanager
 import uvicorn
 import os
 import sys
 import json
+import re
 import asyncio
 from asyncio import Queue
 import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
 
-from .utils import extract_text_from_pdf, validate_job_description
-from .workflow import JobDescriptionAnalysis, TailoredResume, CoverLetter
+from .utils import validate_job_description
+from .pdf_extraction import extract_text_from_pdf_async, shutdown_executor
+from .pdf_rendering import DOCUMENTS, document_content, render_pdf, render_stats, shutdown_render_executor
+from .ingestion import spool_upload, UploadTooLargeError, MAX_UPLOAD_BYTES
 from .database import db_service
+from .pipeline import REGENERABLE_NODES, execute_workflow, regenerate_node, validate_graph_mode, run_stats
+from .cache import jd_analysis_cache
+from .content_store import content_store
+from .near_duplicate import jd_near_duplicates
+from .metrics import RunMetrics, registry, stage_timer, track_run
+from .workflow.prompt_assembly import prompt_stats
+from .workflow.draft_analysis import draft_stats
+from .workflow.output_repair import output_repair_stats
+from .workflow.scheduler import llm_scheduler
+from .workflow.checkpoint import checkpointer, MongoCheckpointSaver
+from .workflow.registry import warm_up
+from .workflow.resume_parser import parse_resume
+from .jobs import job_queue
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await db_service.connect()
+    content_store.start()
+    await job_queue.setup()
+    if isinstance(checkpointer, MongoCheckpointSaver):
+        await checkpointer.setup()
+    # Build LLM clients and compile graphs now rather than on the first request
+    warm_up()
     yield
+    shutdown_executor()
+    shutdown_render_executor()
+    await content_store.drain()
     await db_service.disconnect()
 
 app = FastAPI(title="Resume Agent API", lifespan=lifespan)
@@ -31,114 +59,409 @@ app.add_middleware(
     expose_headers=["Access-Control-Allow-Private-Network"],        
 )
 
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "30"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+# Marks the end of a progress queue
+_STREAM_END = object()
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Reject oversized uploads from Content-Length before the body is parsed."""
+    content_length = request.headers.get("content-length")
+    if request.method == "POST" and content_length and content_length.isdigit():
+        # Allow some headroom for multipart framing and form fields
+        if int(content_length) > MAX_UPLOAD_BYTES + 1024 * 1024:
+            return JSONResponse(status_code=413, content={"detail": "Request body too large"})
+    return await call_next(request)
+
+def sse_event(data: Dict) -> str:
+    return f"data: {json.dumps(data)}\n\n"
+
+async def drain_queue(queue: Queue):
+    """
+    Yield items from a progress queue until the end sentinel arrives.
+    
+    While idle, an SSE comment is yielded every SSE_HEARTBEAT_SECONDS so that
+    proxies keep the connection open and a vanished client is noticed on the
+    next write even by servers that do not report disconnects.
+    """
+    while True:
+        try:
+            item = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+        except asyncio.TimeoutError:
+            yield ": keep-alive\n\n"
+            continue
+        if item is _STREAM_END:
+            return
+        yield item
+
+async def ingest_resume(resume_file: UploadFile) -> str:
+    """Validate, spool and extract text from an uploaded resume PDF."""
+    if not resume_file.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+    
+    # Spool the upload in bounded memory and extract text page by page
+    upload = await spool_upload(resume_file)
+    try:
+        with stage_timer("pdf_extraction"):
+            return await extract_text_from_pdf_async(upload.source, upload.sha256)
+    finally:
+        upload.close()
+
+def stream_workflow(started_event: Dict, run: Callable[[Callable], Awaitable[Dict]]) -> StreamingResponse:
+    """
+    Stream a single workflow run as server-sent events.
+    
+    Args:
+        started_event: Payload of the first event
+        run: Coroutine function taking the progress callback and returning the
+            terminal event payload
+    """
+    async def generate_stream():
+        progress_queue = Queue()
+        
+        async def stream_callback(data):
+            await progress_queue.put(data)
+        
+        # Run graph asynchronously; the sentinel always follows the terminal event
+        async def run_graph():
+            try:
+                await progress_queue.put(await run(stream_callback))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await progress_queue.put({"status": "error", "message": str(e)})
+            finally:
+                progress_queue.put_nowait(_STREAM_END)
+        
+        task = asyncio.create_task(run_graph())
+        
+        try:
+            yield sse_event(started_event)
+            async for item in drain_queue(progress_queue):
+                yield item if isinstance(item, str) else sse_event(item)
+        finally:
+            # Runs when the client disconnects and Starlette cancels the stream
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(generate_stream(), media_type="text/event-stream")
+
 @app.post("/process-resume")
 async def process_resume(
     resume_file: UploadFile = File(...),
-    job_description: str = Form(..., min_length=50)
+    job_description: str = Form(..., min_length=50),
+    graph_mode: str = Form("sequential")
 ):
     start_time = time.time()
+    run_metrics = RunMetrics()
     # Process file and validate inputs BEFORE streaming starts
     try:
-        if not resume_file.filename.lower().endswith('.pdf'):
-            raise HTTPException(status_code=400, detail="Only PDF files are supported")
-        
-        # Read and process PDF content immediately
-        pdf_content = await resume_file.read()
-        resume_text = extract_text_from_pdf(pdf_content)
+        validate_graph_mode(graph_mode)
+        with track_run(run_metrics):
+            resume_text = await ingest_resume(resume_file)
         
         # Validate job description
         validated_job_description = validate_job_description(job_description)
         
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     
-    async def generate_stream():
-        try:
-            yield f"data: {json.dumps({'status': 'started', 'message': 'Processing started'})}\n\n"
-            
-            progress_queue = Queue()
-            
-            async def stream_callback(data):
-                await progress_queue.put(data)
-            
-            from .workflow import resume_agent
-            initial_state = {
-                "messages": [],
-                "job_description": validated_job_description,
-                "original_resume": resume_text,
-                "callback": stream_callback
-            }
-            
-            # Run graph asynchronously
-            async def run_graph():
-                try:
-                    result = await asyncio.wait_for(resume_agent.ainvoke(initial_state), timeout=300)
-                    await progress_queue.put({"type": "result", "data": result})
-                except asyncio.TimeoutError:
-                    await progress_queue.put({"type": "error", "message": "Processing timeout - operation took too long"})
-                except Exception as e:
-                    await progress_queue.put({"type": "error", "message": str(e)})
-            
-            task = asyncio.create_task(run_graph())
-            
-            # Stream progress updates
-            while not task.done() or not progress_queue.empty():
-                try:
-                    data = await asyncio.wait_for(progress_queue.get(), timeout=0.1)
-                    if data.get("type") == "result":
-                        final_state = data["data"]
-                        break
-                    elif data.get("type") == "error":
-                        yield f"data: {json.dumps({'status': 'error', 'message': data['message']})}\n\n"
-                        return
-                    else:
-                        yield f"data: {json.dumps(data)}\n\n"
-                except asyncio.TimeoutError:
-                    await asyncio.sleep(0.1)
-            
-            await task
-            
-            if final_state.get("error"):
-                yield f"data: {json.dumps({'status': 'error', 'message': final_state['error']})}\n\n"
-                return
+    run_id = uuid.uuid4().hex
+    initial_state = {
+        "messages": [],
+        "job_description": validated_job_description,
+        "original_resume": resume_text
+    }
+    
+    return stream_workflow(
+        {"status": "started", "message": "Processing started", "run_id": run_id},
+        lambda callback: execute_workflow(
+            initial_state, resume_file.filename, start_time, graph_mode,
+            callback=callback, run_id=run_id, run_metrics=run_metrics
+        )
+    )
+
+@app.post("/runs/{run_id}/resume")
+async def resume_run(run_id: str):
+    """Continue a failed, timed out or abandoned run from its last completed node."""
+    from .workflow import find_resume_checkpoint
+    
+    snapshot = await find_resume_checkpoint(run_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="No resumable checkpoint found for this run")
+    
+    graph_mode = snapshot.metadata.get("graph_mode", "sequential")
+    resume_filename = snapshot.metadata.get("resume_filename", "")
+    
+    return stream_workflow(
+        {"status": "started", "message": "Resuming processing", "run_id": run_id, "resume_from": list(snapshot.next)},
+        lambda callback: execute_workflow(
+            None, resume_filename, time.time(), graph_mode, callback=callback, run_id=run_id, resume_from=snapshot
+        )
+    )
+
+@app.post("/process-resume/batch")
+async def process_resume_batch(
+    resume_file: UploadFile = File(...),
+    job_descriptions: List[str] = Form(...),
+    graph_mode: str = Form("sequential")
+):
+    """Tailor one resume against many job descriptions, ingesting the PDF only once."""
+    start_time = time.time()
+    try:
+        if len(job_descriptions) > MAX_BATCH_SIZE:
+            raise ValueError(f"Too many job descriptions (maximum {MAX_BATCH_SIZE})")
+        validate_graph_mode(graph_mode)
+        
+        ingest_metrics = RunMetrics()
+        with track_run(ingest_metrics):
+            resume_text = await ingest_resume(resume_file)
+        validated_job_descriptions = [validate_job_description(jd) for jd in job_descriptions]
+        
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Parse the resume once up front; every run in the batch reuses the cached parse
+    parse_resume(resume_text)
+    batch_id = uuid.uuid4().hex
+    
+    async def generate_batch_stream():
+        progress_queue = Queue()
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+        
+        async def run_job(job_index: int, job_description: str):
+            async def job_callback(data):
+                await progress_queue.put({"type": "progress", "data": {**data, "job_index": job_index}})
             
-            # Validate outputs using Pydantic models
             try:
-                job_analysis = JobDescriptionAnalysis(**final_state.get("jd_analysis", {}))
-                tailored_resume = TailoredResume(**final_state.get("tailored_resume", {}))
-                cover_letter = CoverLetter(**final_state.get("cover_letter", {}))
-                
-                final_data = {
-                    "job_analysis": job_analysis.model_dump(),
-                    "tailored_resume": tailored_resume.model_dump(),
-                    "cover_letter": cover_letter.model_dump()
-                }
-            except Exception as validation_error:
-                yield f"data: {json.dumps({'status': 'error', 'message': f'Output validation failed: {str(validation_error)}'})}\n\n"
-                return
-            
-            # Save to MongoDB
+                async with semaphore:
+                    initial_state = {
+                        "messages": [],
+                        "job_description": job_description,
+                        "original_resume": resume_text
+                    }
+                    result = await execute_workflow(
+                        initial_state,
+                        resume_file.filename,
+                        start_time,
+                        graph_mode,
+                        callback=job_callback,
+                        metadata={"batch_id": batch_id, "job_index": job_index},
+                        run_metrics=RunMetrics(ingest_metrics.stages)
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                result = {"status": "error", "message": str(e)}
+            await progress_queue.put({"type": "result", "data": {**result, "job_index": job_index}})
+        
+        async def run_batch():
             try:
-                workflow_data = {
-                    "job_description": validated_job_description,
-                    "resume_filename": resume_file.filename,
-                    "job_analysis": final_data["job_analysis"],
-                    "tailored_resume": final_data["tailored_resume"],
-                    "cover_letter": final_data["cover_letter"],
-                    "processing_time_seconds": time.time() - start_time,
-                    "status": "completed"
-                }
-                result_id = await db_service.save_workflow_result(workflow_data)
-                final_data["database_id"] = result_id
-            except Exception as db_error:
-                print(f"Database save error: {db_error}")
+                await asyncio.gather(*(
+                    run_job(index, jd) for index, jd in enumerate(validated_job_descriptions)
+                ))
+            finally:
+                progress_queue.put_nowait(_STREAM_END)
+        
+        task = asyncio.create_task(run_batch())
+        
+        try:
+            yield sse_event({"status": "started", "message": "Batch processing started", "batch_id": batch_id, "total_jobs": len(validated_job_descriptions)})
             
-            yield f"data: {json.dumps({'status': 'completed', 'message': 'Processing completed', 'data': final_data})}\n\n"
+            succeeded = 0
+            async for item in drain_queue(progress_queue):
+                if isinstance(item, str):
+                    yield item
+                    continue
+                if item["type"] == "result" and item["data"]["status"] == "completed":
+                    succeeded += 1
+                yield sse_event(item["data"])
             
-        except Exception as e:
-            yield f"data: {json.dumps({'status': 'error', 'message': str(e)})}\n\n"
+            yield sse_event({"status": "batch_completed", "message": "Batch processing completed", "batch_id": batch_id, "succeeded": succeeded, "failed": len(validated_job_descriptions) - succeeded})
+        finally:
+            if not task.done():
+                task.cancel()
     
-    return StreamingResponse(generate_stream(), media_type="text/event-stream")
+    return StreamingResponse(generate_batch_stream(), media_type="text/event-stream")
+
+@app.post("/jobs")
+async def submit_job(
+    resume_file: UploadFile = File(...),
+    job_description: str = Form(..., min_length=50),
+    graph_mode: str = Form("sequential")
+):
+    """Queue a pipeline run for the worker pool and return its id immediately."""
+    try:
+        validate_graph_mode(graph_mode)
+        resume_text = await ingest_resume(resume_file)
+        validated_job_description = validate_job_description(job_description)
+        
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    job_id = await job_queue.enqueue({
+        "job_description": validated_job_description,
+        "resume_text": resume_text,
+        "resume_filename": resume_file.filename,
+        "graph_mode": graph_mode
+    })
+    return {"job_id": job_id, "status": "queued", "events": f"/jobs/{job_id}/events"}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job["job_id"] = job.pop("_id")
+    return jsonable_encoder(job)
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """Stream a job's persisted progress events; honours Last-Event-ID on reconnect."""
+    if await job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    last_event_id = request.headers.get("last-event-id", "")
+    after_seq = int(last_event_id) if last_event_id.isdigit() else 0
+    
+    async def generate_job_stream():
+        idle_since = time.monotonic()
+        async for seq, event in job_queue.iter_events(job_id, after_seq):
+            if event is None:
+                if time.monotonic() - idle_since >= SSE_HEARTBEAT_SECONDS:
+                    idle_since = time.monotonic()
+                    yield ": keep-alive\n\n"
+                continue
+            idle_since = time.monotonic()
+            yield f"id: {seq}\n{sse_event(event)}"
+    
+    return StreamingResponse(generate_job_stream(), media_type="text/event-stream")
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated projection such as "run_id,job_analysis.role_title"."""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    if any(not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_.]*", name) for name in names):
+        raise HTTPException(status_code=400, detail="Invalid fields")
+    return names
+
+def serialize_result(doc: Dict) -> Dict:
+    doc = dict(doc)
+    doc["id"] = str(doc.pop("_id"))
+    return jsonable_encoder(doc)
+
+@app.get("/results")
+async def list_results(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    resume_filename: Optional[str] = None,
+    role_title: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """List past runs newest first. Pass next_cursor back as cursor for the following page."""
+    fields = parse_fields(fields)
+    try:
+        results, next_cursor = await db_service.list_workflow_results(
+            limit, cursor, resume_filename, role_title, content_store.stored_fields(fields)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Summary listings carry no content fields unless they were asked for
+    if fields:
+        await content_store.hydrate(results, fields)
+    return {"results": [serialize_result(doc) for doc in results], "next_cursor": next_cursor}
+
+@app.get("/results/{result_id}")
+async def get_result(result_id: str, fields: Optional[str] = None):
+    fields = parse_fields(fields)
+    doc = await db_service.get_workflow_result(result_id, content_store.stored_fields(fields))
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+    await content_store.hydrate([doc], fields)
+    return serialize_result(doc)
+
+@app.post("/results/{result_id}/regenerate")
+async def regenerate_result(
+    result_id: str,
+    node: str = Form("cover_letter_generator"),
+    temperature: Optional[float] = Form(None, ge=0, le=2),
+    tone: Optional[str] = Form(None, max_length=50)
+):
+    """Re-run one node of a stored result with new options and save it as a linked revision."""
+    if node not in REGENERABLE_NODES:
+        raise HTTPException(status_code=400, detail=f"node must be one of: {', '.join(REGENERABLE_NODES)}")
+    
+    original = await db_service.get_workflow_result(result_id)
+    if original is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+    if original.get("status") != "completed":
+        raise HTTPException(status_code=409, detail="Only completed results can be regenerated")
+    await content_store.hydrate([original], ["job_description", "job_analysis", "resume_text"])
+    if node == "resume_tailor" and not original.get("resume_text"):
+        raise HTTPException(status_code=409, detail="Result has no stored resume text to tailor")
+    
+    options = {}
+    if temperature is not None:
+        # Rounded so repeated requests share one client per temperature
+        options["temperature"] = round(temperature, 1)
+    if tone and tone.strip():
+        options["tone"] = tone.strip()
+    
+    run_id = uuid.uuid4().hex
+    return stream_workflow(
+        {"status": "started", "message": f"Regenerating {node}", "run_id": run_id, "revision_of": result_id},
+        lambda callback: regenerate_node(original, node, options, callback=callback, run_id=run_id)
+    )
+
+@app.get("/results/{result_id}/pdf")
+async def download_result_pdf(result_id: str, document: str = Query("resume")):
+    """Render a stored result's tailored resume or cover letter to PDF; repeat downloads come from the render cache."""
+    if document not in DOCUMENTS:
+        raise HTTPException(status_code=400, detail=f"document must be one of: {', '.join(DOCUMENTS)}")
+    
+    result = await db_service.get_workflow_result(result_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+    await content_store.hydrate([result], ["resume_text"])
+    candidate_name = parse_resume(result["resume_text"]).name if result.get("resume_text") else None
+    try:
+        content = document_content(result, document, candidate_name)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    try:
+        with stage_timer("pdf_rendering", document):
+            path = await render_pdf(result_id, document, content)
+            # Opened here so a later cache prune cannot remove the file mid-response
+            try:
+                pdf = open(path, "rb")
+            except FileNotFoundError:
+                # Pruned between rendering and opening; render it again
+                path = await render_pdf(result_id, document, content)
+                pdf = open(path, "rb")
+    except (ValueError, FileNotFoundError) as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    def read_pdf():
+        with pdf:
+            while chunk := pdf.read(64 * 1024):
+                yield chunk
+    
+    filename = f"{document}-{result_id}.pdf"
+    return StreamingResponse(read_pdf(), media_type="application/pdf", headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Content-Length": str(os.fstat(pdf.fileno()).st_size)
+    })
 
 @app.get("/health")
 async def health_check():
@@ -146,10 +469,40 @@ async def health_check():
         "status": "healthy",
         "service": "Resume Agent API",
         "endpoints": {
-            "process_resume": "/process-resume"
+            "process_resume": "/process-resume",
+            "process_resume_batch": "/process-resume/batch",
+            "resume_run": "/runs/{run_id}/resume",
+            "submit_job": "/jobs",
+            "job_events": "/jobs/{job_id}/events",
+            "results": "/results",
+            "result": "/results/{result_id}",
+            "regenerate_result": "/results/{result_id}/regenerate",
+            "result_pdf": "/results/{result_id}/pdf",
+            "stats": "/stats",
+            "metrics": "/metrics"
         }
     }
 
+@app.get("/stats")
+async def stats():
+    return {
+        "jd_analysis_cache": jd_analysis_cache.stats(),
+        "jd_near_duplicates": jd_near_duplicates.stats(),
+        "runs": run_stats,
+        "llm_scheduler": llm_scheduler.stats(),
+        "prompt_tokens": prompt_stats.stats(),
+        "jd_drafts": draft_stats,
+        "output_repairs": output_repair_stats,
+        "write_buffer": db_service.write_buffer.stats(),
+        "content_store": content_store.stats(),
+        "pdf_rendering": render_stats
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Stage latency histograms and LLM token counters in Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/db-check")
 async def database_check():
     try:
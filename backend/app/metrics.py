@@ -0,0 +1,186 @@
+"""
+In-process latency and token metrics.
+
+Stage timers and token counters feed a small registry rendered in the
+Prometheus text exposition format on /metrics. While a pipeline run is in
+progress, the same observations are also collected into a RunMetrics record
+(tracked through a context variable) that is stored with the workflow result.
+"""
+
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed set of label names."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # label values -> [bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        series = self._values.setdefault(key, [0] * (len(self.buckets) + 2))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, series in sorted(self._values.items()):
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-2] + series[-1:]):
+                labels = _format_labels(self.labelnames, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds the application's metrics and renders them for scraping."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+stage_seconds = registry.register(Histogram(
+    "careercraft_stage_duration_seconds",
+    "Duration of pipeline stages (pdf_extraction, node, llm_call, output_parsing, output_validation, db_save)",
+    ("stage", "name")
+))
+llm_calls_total = registry.register(Counter(
+    "careercraft_llm_calls_total", "LLM calls made by each agent", ("agent",)
+))
+llm_tokens_total = registry.register(Counter(
+    "careercraft_llm_tokens_total", "LLM tokens reported by the provider, by agent and direction", ("agent", "type")
+))
+output_repairs_total = registry.register(Counter(
+    "careercraft_output_repairs_total", "Structured outputs that needed repair, by agent and kind (partial, full, failed)", ("agent", "kind")
+))
+
+
+class RunMetrics:
+    """Stage timings and token usage collected for a single pipeline run."""
+
+    def __init__(self, stages: Optional[List[Dict]] = None):
+        self.stages: List[Dict] = list(stages or [])
+        self.tokens: Dict[str, Dict[str, int]] = {}
+
+    def add_stage(self, stage: str, name: str, seconds: float) -> None:
+        self.stages.append({"stage": stage, "name": name, "seconds": round(seconds, 4)})
+
+    def add_tokens(self, agent: str, prompt_tokens: int, completion_tokens: int) -> None:
+        usage = self.tokens.setdefault(agent, {"prompt_tokens": 0, "completion_tokens": 0})
+        usage["prompt_tokens"] += prompt_tokens
+        usage["completion_tokens"] += completion_tokens
+
+    def to_dict(self) -> Dict:
+        return {"stages": list(self.stages), "tokens": dict(self.tokens)}
+
+
+current_run_metrics: ContextVar[Optional[RunMetrics]] = ContextVar("current_run_metrics", default=None)
+
+
+@contextmanager
+def track_run(run_metrics: RunMetrics) -> Iterator[RunMetrics]:
+    """Collect observations made in this context (and tasks it spawns) into run_metrics."""
+    token = current_run_metrics.set(run_metrics)
+    try:
+        yield run_metrics
+    finally:
+        current_run_metrics.reset(token)
+
+
+@contextmanager
+def stage_timer(stage: str, name: str = "") -> Iterator[None]:
+    """Time a block as one observation of the given stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stage_seconds.observe(elapsed, stage=stage, name=name)
+        run_metrics = current_run_metrics.get()
+        if run_metrics is not None:
+            run_metrics.add_stage(stage, name, elapsed)
+
+
+def timed(stage: str, name: str = "") -> Callable:
+    """Decorator form of stage_timer for coroutine functions."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with stage_timer(stage, name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_llm_usage(agent: str, usage: Optional[Dict]) -> None:
+    """Count one LLM call and the token usage reported with its response."""
+    llm_calls_total.inc(agent=agent)
+    if not usage:
+        return
+    prompt_tokens = usage.get("input_tokens", 0)
+    completion_tokens = usage.get("output_tokens", 0)
+    llm_tokens_total.inc(prompt_tokens, agent=agent, type="prompt")
+    llm_tokens_total.inc(completion_tokens, agent=agent, type="completion")
+    run_metrics = current_run_metrics.get()
+    if run_metrics is not None:
+        run_metrics.add_tokens(agent, prompt_tokens, completion_tokens)
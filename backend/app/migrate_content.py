@@ -0,0 +1,83 @@
+"""
+Move inline job descriptions, analyses and resume text out of stored results.
+
+Run once after upgrading to content-addressed storage:
+
+    python -m app.migrate_content [--batch-size 500]
+
+Each workflow result that still carries a job_description, job_analysis or
+resume_text inline gets the value stored in its content collection and
+replaced by the hash. The migration is idempotent and can be re-run or
+interrupted safely; documents already migrated are skipped, and a document
+whose content could not be confirmed stored keeps it inline for the next run.
+"""
+
+import argparse
+import asyncio
+
+from pymongo import UpdateOne
+
+from .content_store import CONTENT_FIELDS, content_hash, content_store, hash_field
+from .database import db_service
+
+
+async def migrate(batch_size: int) -> int:
+    """Externalize content fields of every unmigrated result; returns the number updated."""
+    query = {"$or": [{field: {"$exists": True}} for field in CONTENT_FIELDS]}
+    projection = {field: 1 for field in CONTENT_FIELDS}
+    migrated = skipped = 0
+    last_id = None
+
+    while True:
+        page_query = dict(query, _id={"$gt": last_id}) if last_id is not None else query
+        docs = await db_service.collection.find(page_query, projection).sort("_id", 1).limit(batch_size).to_list(
+            length=batch_size
+        )
+        if not docs:
+            break
+        last_id = docs[-1]["_id"]
+
+        # Blobs are written and confirmed before any result stops carrying its content inline
+        blobs = {field: {} for field in CONTENT_FIELDS}
+        digests = []
+        for doc in docs:
+            hashes = {field: content_hash(doc[field]) for field in CONTENT_FIELDS if doc.get(field) is not None}
+            for field, digest in hashes.items():
+                blobs[field][digest] = doc[field]
+            digests.append(hashes)
+        confirmed = {field: await content_store.put_many_now(field, values) if values else set() for field, values in blobs.items()}
+
+        updates = []
+        for doc, hashes in zip(docs, digests):
+            if any(digest not in confirmed[field] for field, digest in hashes.items()):
+                skipped += 1
+                continue
+            fields = content_store.listing_fields(doc)
+            fields.update({hash_field(field): digest for field, digest in hashes.items()})
+            updates.append(UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": fields, "$unset": {field: "" for field in CONTENT_FIELDS if field in doc}}
+            ))
+        if updates:
+            await db_service.collection.bulk_write(updates, ordered=False)
+        migrated += len(updates)
+        print(f"Migrated {migrated} workflow results ({skipped} skipped, content not confirmed stored)")
+
+    return migrated
+
+
+async def main(batch_size: int) -> None:
+    await db_service.connect()
+    try:
+        migrated = await migrate(batch_size)
+        print(f"Content migration complete: {migrated} workflow results updated")
+    finally:
+        await content_store.drain()
+        await db_service.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move result content into content-addressed collections")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -0,0 +1,176 @@
+"""
+Near-duplicate detection for job descriptions.
+
+Reposted jobs often differ only by a date, a location or some boilerplate, so
+their exact content hashes differ. Each analyzed posting gets a MinHash
+signature over word shingles, split into LSH bands. A new posting's bands
+select candidate postings from an in-process index (falling back to the
+shared MongoDB collection, which is indexed on the bands), and the best
+candidate is reused when its estimated Jaccard similarity clears
+NEAR_DUPLICATE_THRESHOLD.
+"""
+
+import hashlib
+import os
+import random
+import re
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Set, Tuple
+
+from .database import db_service
+
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.85"))
+NEAR_DUPLICATE_LOCAL_MAX_ENTRIES = int(os.getenv("NEAR_DUPLICATE_LOCAL_MAX_ENTRIES", "10000"))
+NEAR_DUPLICATE_MAX_CANDIDATES = int(os.getenv("NEAR_DUPLICATE_MAX_CANDIDATES", "20"))
+
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 64
+# 16 bands of 4 rows: postings above ~0.5 similarity almost always share a band
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+
+_MERSENNE_PRIME = (1 << 61) - 1
+# Fixed seed: signatures are persisted and must stay comparable across processes
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+(?:[./-][a-z0-9+#]+)*")
+# A senior and a junior posting can be otherwise identical but must not share an analysis
+_LEVEL_RE = re.compile(r"\b(senior|sr|junior|jr|lead|principal|staff|intern|entry|mid)\b")
+
+
+class JDSignature(NamedTuple):
+    minhash: Tuple[int, ...]
+    bands: Tuple[str, ...]
+    levels: Tuple[str, ...]
+
+
+class NearDuplicate(NamedTuple):
+    key: str
+    similarity: float
+
+
+def _shingle_hashes(text: str) -> Set[int]:
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < SHINGLE_SIZE:
+        shingles = [" ".join(tokens)]
+    else:
+        shingles = [" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)]
+    return {
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for shingle in shingles
+    }
+
+
+def compute_signature(job_description: str) -> JDSignature:
+    """MinHash signature, LSH band keys and seniority markers of a posting."""
+    hashes = _shingle_hashes(job_description)
+    minhash = tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS)
+    bands = tuple(
+        f"{band}:" + hashlib.blake2b(
+            repr(minhash[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]).encode(), digest_size=8
+        ).hexdigest()
+        for band in range(BANDS)
+    )
+    levels = tuple(sorted(set(_LEVEL_RE.findall(job_description.lower()))))
+    return JDSignature(minhash, bands, levels)
+
+
+def estimate_similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity: the share of matching MinHash slots."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERMUTATIONS
+
+
+class NearDuplicateIndex:
+    """
+    Two-tier LSH index of analyzed job descriptions.
+
+    The in-process tier keeps the most recent NEAR_DUPLICATE_LOCAL_MAX_ENTRIES
+    signatures with a band -> keys table, so lookups are a handful of dict
+    probes. Misses query the shared collection through its multikey index on
+    the bands, which scales to millions of postings and survives restarts.
+    """
+
+    def __init__(self, max_entries: int = NEAR_DUPLICATE_LOCAL_MAX_ENTRIES, threshold: float = NEAR_DUPLICATE_THRESHOLD):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._entries: "OrderedDict[str, JDSignature]" = OrderedDict()
+        self._bands: Dict[str, Set[str]] = {}
+        self.lookups = 0
+        self.local_hits = 0
+        self.shared_hits = 0
+
+    def _remember(self, key: str, signature: JDSignature) -> None:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        self._entries[key] = signature
+        for band in signature.bands:
+            self._bands.setdefault(band, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            old_key, old_signature = self._entries.popitem(last=False)
+            for band in old_signature.bands:
+                keys = self._bands.get(band)
+                if keys is not None:
+                    keys.discard(old_key)
+                    if not keys:
+                        del self._bands[band]
+
+    def _best(self, signature: JDSignature, candidates: Dict[str, JDSignature]) -> Optional[NearDuplicate]:
+        best = None
+        for key, candidate in candidates.items():
+            if candidate.levels != signature.levels:
+                continue
+            similarity = estimate_similarity(signature.minhash, candidate.minhash)
+            if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                best = NearDuplicate(key, similarity)
+        return best
+
+    async def find(self, signature: JDSignature) -> Optional[NearDuplicate]:
+        """Return the most similar indexed posting above the threshold, if any."""
+        self.lookups += 1
+        keys = set()
+        for band in signature.bands:
+            keys.update(self._bands.get(band, ()))
+        match = self._best(signature, {key: self._entries[key] for key in keys})
+        if match is not None:
+            self.local_hits += 1
+            return match
+
+        try:
+            docs = await db_service.find_jd_signatures(list(signature.bands), NEAR_DUPLICATE_MAX_CANDIDATES)
+        except Exception as e:
+            print(f"Near-duplicate lookup failed: {e}")
+            return None
+        candidates = {
+            doc["_id"]: JDSignature(tuple(doc["minhash"]), tuple(doc["bands"]), tuple(doc.get("levels", [])))
+            for doc in docs if doc["_id"] not in keys
+        }
+        match = self._best(signature, candidates)
+        if match is not None:
+            self.shared_hits += 1
+            self._remember(match.key, candidates[match.key])
+        return match
+
+    async def add(self, key: str, signature: JDSignature) -> None:
+        """Index an analyzed posting in both tiers."""
+        self._remember(key, signature)
+        try:
+            await db_service.save_jd_signature(key, list(signature.minhash), list(signature.bands), list(signature.levels))
+        except Exception as e:
+            print(f"Near-duplicate index write failed: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            "lookups": self.lookups,
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "local_size": len(self._entries),
+            "threshold": self.threshold
+        }
+
+
+jd_near_duplicates = NearDuplicateIndex()
@@ -0,0 +1,137 @@
+"""
+Off-loop PDF text extraction for the resume agent API.
+
+PyPDF2 parsing is CPU-bound and can take seconds on large or malformed
+documents, so it runs in a bounded process pool instead of the event loop.
+Extracted text is cached by the SHA-256 of the uploaded bytes because the
+same resume is typically uploaded once per application.
+"""
+
+import asyncio
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Union
+
+from .cache import TTLCache
+from .utils import extract_text_from_pdf
+
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))
+PDF_TIMEOUT_SECONDS = float(os.getenv("PDF_TIMEOUT_SECONDS", "20"))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "20"))
+
+pdf_text_cache = TTLCache(
+    maxsize=int(os.getenv("PDF_CACHE_MAX_ENTRIES", "256")),
+    ttl=float(os.getenv("PDF_CACHE_TTL_SECONDS", "3600"))
+)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(max(PDF_WORKERS, 1))
+    return _slots
+
+
+def _kill_executor(executor: ProcessPoolExecutor) -> None:
+    """
+    Terminate a pool so a worker stuck on a pathological PDF is reclaimed.
+
+    Only the given pool is torn down; if it was already replaced, the
+    replacement keeps serving other uploads.
+    """
+    global _executor
+    if _executor is executor:
+        _executor = None
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_executor() -> None:
+    """Shut down the extraction pool; called from the app lifespan."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+async def _run_extraction(source: Union[bytes, str]) -> str:
+    if PDF_WORKERS <= 0:
+        return await asyncio.to_thread(extract_text_from_pdf, source, PDF_MAX_PAGES)
+
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    try:
+        future = loop.run_in_executor(executor, extract_text_from_pdf, source, PDF_MAX_PAGES)
+        return await asyncio.wait_for(future, timeout=PDF_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        _kill_executor(executor)
+        raise ValueError("Failed to extract text from PDF: processing timed out")
+    except BrokenProcessPool:
+        # Drop the broken pool so the next submission starts a fresh one
+        _kill_executor(executor)
+        raise
+    except asyncio.CancelledError:
+        # Queued work is cancelled when another request's timeout recycles the pool
+        if not asyncio.current_task().cancelling():
+            raise BrokenProcessPool("Extraction pool was recycled while the PDF was queued")
+        raise
+
+
+def _hash_source(source: Union[bytes, str]) -> str:
+    if isinstance(source, bytes):
+        return hashlib.sha256(source).hexdigest()
+    digest = hashlib.sha256()
+    with open(source, "rb") as f:
+        while chunk := f.read(64 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def extract_text_from_pdf_async(source: Union[bytes, str], sha256: Optional[str] = None) -> str:
+    """
+    Extract text from a PDF without blocking the event loop.
+
+    Spooled uploads are passed to the worker by path so large files are never
+    copied through the pool as bytes.
+
+    Args:
+        source: PDF content as bytes, or a path to a PDF file on disk
+        sha256: Precomputed hex digest of the content, used as the cache key
+
+    Returns:
+        Extracted text content as string
+
+    Raises:
+        ValueError: If PDF processing fails or exceeds the time limit
+    """
+    digest = sha256 or _hash_source(source)
+    cached_text = pdf_text_cache.get(digest)
+    if cached_text is not None:
+        return cached_text
+
+    async with _get_slots():
+        try:
+            text = await _run_extraction(source)
+        except BrokenProcessPool:
+            # Another request's timeout recycled the pool underneath us; retry once
+            text = await _run_extraction(source)
+
+    pdf_text_cache.set(digest, text)
+    return text
@@ -0,0 +1,298 @@
+"""
+Server-side PDF rendering of tailored resumes and cover letters.
+
+Layout with reportlab is CPU-bound, so documents are rendered in a bounded
+process pool. Each worker registers its fonts and builds the paragraph
+styles once, when it starts, instead of on every document. Rendered files
+are cached on disk under the result id and the SHA-256 of the rendered
+content, so repeat downloads are served straight from disk and a revision
+with new content gets a new file. The cache keeps the
+RENDER_CACHE_MAX_FILES most recently used files.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+from .content_store import content_hash
+
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+RENDER_TIMEOUT_SECONDS = float(os.getenv("RENDER_TIMEOUT_SECONDS", "30"))
+RENDER_CACHE_DIR = os.getenv("RENDER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "resume-agent-renders"))
+RENDER_CACHE_MAX_FILES = int(os.getenv("RENDER_CACHE_MAX_FILES", "500"))
+# Optional TTF fonts for non-Latin text; the built-in Helvetica is used otherwise
+RENDER_FONT_PATH = os.getenv("RENDER_FONT_PATH")
+RENDER_BOLD_FONT_PATH = os.getenv("RENDER_BOLD_FONT_PATH")
+
+DOCUMENTS = ("resume", "cover_letter")
+
+# Per-process paragraph styles, built by _init_worker
+_styles: Optional[Dict] = None
+
+_executor: Optional[ProcessPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+# Cache path -> render in progress, so concurrent downloads of one document render it once
+_inflight: Dict[str, asyncio.Task] = {}
+
+render_stats = {"renders": 0, "cache_hits": 0, "failures": 0}
+
+
+def _init_worker() -> None:
+    """Register fonts and build the document styles; runs once per worker process."""
+    global _styles
+    from reportlab.lib.enums import TA_LEFT
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    regular, bold = "Helvetica", "Helvetica-Bold"
+    if RENDER_FONT_PATH:
+        pdfmetrics.registerFont(TTFont("ResumeRegular", RENDER_FONT_PATH))
+        regular = bold = "ResumeRegular"
+    if RENDER_FONT_PATH and RENDER_BOLD_FONT_PATH:
+        pdfmetrics.registerFont(TTFont("ResumeBold", RENDER_BOLD_FONT_PATH))
+        bold = "ResumeBold"
+
+    body = ParagraphStyle("body", fontName=regular, fontSize=10, leading=14, alignment=TA_LEFT)
+    _styles = {
+        "name": ParagraphStyle("name", parent=body, fontName=bold, fontSize=18, leading=22, spaceAfter=10),
+        "heading": ParagraphStyle("heading", parent=body, fontName=bold, fontSize=11, leading=15, spaceBefore=10, spaceAfter=4),
+        "body": body,
+        "bullet": ParagraphStyle("bullet", parent=body, leftIndent=12, bulletIndent=2),
+        "letter": ParagraphStyle("letter", parent=body, fontSize=11, leading=16, spaceAfter=10),
+    }
+
+
+def _paragraphs(text: str, styles: Dict) -> List:
+    from reportlab.platypus import Paragraph
+
+    flowables = []
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        if line[0] in "-•*":
+            flowables.append(Paragraph(escape(line[1:].strip()), styles["bullet"], bulletText="•"))
+        else:
+            flowables.append(Paragraph(escape(line), styles["body"]))
+    return flowables
+
+
+def _resume_story(content: Dict, styles: Dict) -> List:
+    from reportlab.platypus import Paragraph
+
+    story = []
+    if content.get("candidate_name"):
+        story.append(Paragraph(escape(content["candidate_name"]), styles["name"]))
+    for section in content["sections"]:
+        story.append(Paragraph(escape(section["title"]), styles["heading"]))
+        story.extend(_paragraphs(section["content"], styles))
+    return story
+
+
+def _cover_letter_story(content: Dict, styles: Dict) -> List:
+    from reportlab.platypus import Paragraph, Spacer
+
+    story = []
+    if content.get("candidate_name"):
+        story.append(Paragraph(escape(content["candidate_name"]), styles["name"]))
+    story.append(Paragraph(escape(content["date"]), styles["letter"]))
+    if content.get("role_title"):
+        role = content["role_title"] + (f" at {content['company_name']}" if content.get("company_name") else "")
+        story.append(Paragraph(escape(f"Re: {role}"), styles["letter"]))
+    story.append(Spacer(1, 6))
+    letter = content["cover_letter"]
+    for paragraph in [letter["opening_paragraph"], *letter["body_paragraphs"], letter["closing_paragraph"]]:
+        story.append(Paragraph(escape(paragraph), styles["letter"]))
+    story.append(Paragraph("Sincerely,", styles["letter"]))
+    if content.get("candidate_name"):
+        story.append(Paragraph(escape(content["candidate_name"]), styles["letter"]))
+    return story
+
+
+def render_document(document: str, content: Dict, path: str) -> str:
+    """Render a resume or cover letter to path; runs inside a pool worker."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate
+
+    if _styles is None:
+        _init_worker()
+    story = _resume_story(content, _styles) if document == "resume" else _cover_letter_story(content, _styles)
+    # Written next to the final path and renamed, so readers never see a partial file
+    partial = f"{path}.{os.getpid()}.part"
+    try:
+        SimpleDocTemplate(
+            partial, pagesize=letter,
+            leftMargin=0.75 * inch, rightMargin=0.75 * inch, topMargin=0.75 * inch, bottomMargin=0.75 * inch
+        ).build(story)
+        os.replace(partial, path)
+    except Exception as e:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise ValueError(f"Failed to render PDF: {str(e)}")
+    return path
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+    return _executor
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(max(RENDER_WORKERS, 1))
+    return _slots
+
+
+def _kill_executor(executor: ProcessPoolExecutor) -> None:
+    """
+    Terminate a pool so a worker stuck on a pathological document is reclaimed.
+
+    Only the given pool is torn down; if it was already replaced, the
+    replacement keeps serving other downloads.
+    """
+    global _executor
+    if _executor is executor:
+        _executor = None
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_render_executor() -> None:
+    """Shut down the render pool; called from the app lifespan."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+async def _run_render(document: str, content: Dict, path: str) -> str:
+    if RENDER_WORKERS <= 0:
+        return await asyncio.to_thread(render_document, document, content, path)
+
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    try:
+        future = loop.run_in_executor(executor, render_document, document, content, path)
+        return await asyncio.wait_for(future, timeout=RENDER_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        _kill_executor(executor)
+        raise ValueError("Failed to render PDF: rendering timed out")
+    except BrokenProcessPool:
+        # Drop the broken pool so the next submission starts a fresh one
+        _kill_executor(executor)
+        raise
+    except asyncio.CancelledError:
+        # Queued work is cancelled when another request's timeout recycles the pool
+        if not asyncio.current_task().cancelling():
+            raise BrokenProcessPool("Render pool was recycled while the document was queued")
+        raise
+
+
+def _prune_cache(keep: str) -> None:
+    """Drop the least recently used files beyond RENDER_CACHE_MAX_FILES, never keep."""
+    entries = [entry for entry in os.scandir(RENDER_CACHE_DIR) if entry.name.endswith(".pdf") and entry.path != keep]
+    excess = len(entries) + 1 - RENDER_CACHE_MAX_FILES
+    if excess <= 0:
+        return
+    # Cache hits touch their file, so mtime is the time of last use
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[:excess]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+def document_content(result: Dict, document: str, candidate_name: Optional[str] = None) -> Dict:
+    """
+    Collect what a document is rendered from out of a stored workflow result.
+
+    Raises:
+        ValueError: If the result has no output for the requested document
+    """
+    field = "tailored_resume" if document == "resume" else "cover_letter"
+    if not result.get(field):
+        raise ValueError(f"Result has no {field.replace('_', ' ')} to render")
+    if document == "resume":
+        return {"candidate_name": candidate_name, "sections": result["tailored_resume"]["sections"]}
+    timestamp = result.get("timestamp")
+    return {
+        "candidate_name": candidate_name,
+        "role_title": result.get("role_title"),
+        "company_name": result.get("company_name"),
+        "date": (timestamp.date() if timestamp else date.today()).strftime("%B %d, %Y").replace(" 0", " "),
+        "cover_letter": result["cover_letter"],
+    }
+
+
+async def _render(document: str, content: Dict, path: str) -> str:
+    try:
+        os.makedirs(RENDER_CACHE_DIR, exist_ok=True)
+        async with _get_slots():
+            try:
+                await _run_render(document, content, path)
+            except BrokenProcessPool:
+                # Another request's timeout recycled the pool underneath us; retry once
+                await _run_render(document, content, path)
+        render_stats["renders"] += 1
+    except Exception:
+        render_stats["failures"] += 1
+        raise
+    finally:
+        del _inflight[path]
+
+    _prune_cache(path)
+    return path
+
+
+async def render_pdf(result_id: str, document: str, content: Dict) -> str:
+    """
+    Return the path of the rendered PDF for a result's document, rendering it on a cache miss.
+
+    Args:
+        result_id: Id of the stored workflow result
+        document: "resume" or "cover_letter"
+        content: Output of document_content for the result
+
+    Returns:
+        Path to the PDF file in RENDER_CACHE_DIR
+
+    Raises:
+        ValueError: If rendering fails or exceeds the time limit
+    """
+    digest = content_hash({"document": document, "content": content})
+    path = os.path.join(RENDER_CACHE_DIR, f"{result_id}-{document}-{digest[:16]}.pdf")
+    try:
+        # Marks the file recently used for _prune_cache
+        os.utime(path)
+        render_stats["cache_hits"] += 1
+        return path
+    except FileNotFoundError:
+        pass
+
+    task = _inflight.get(path)
+    if task is not None:
+        render_stats["cache_hits"] += 1
+    else:
+        # Detached from this request, so a client that disconnects does not
+        # cancel the render other downloads are waiting on
+        task = _inflight[path] = asyncio.create_task(_render(document, content, path))
+        # Retrieve the outcome here so a render nobody waits for any more does not warn
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+    return await asyncio.shield(task)
@@ -0,0 +1,242 @@
+"""
+Workflow execution shared by the HTTP endpoints and the job workers.
+
+Runs the resume agent graph for one job description, validates the agent
+outputs against the Pydantic models and persists the result.
+"""
+
+import asyncio
+import time
+import uuid
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+
+from .content_store import save_workflow_result
+from .metrics import RunMetrics, stage_timer, track_run
+from .workflow import JobDescriptionAnalysis, TailoredResume, CoverLetter, GRAPH_MODES
+from .workflow.checkpoint import checkpointer
+
+if TYPE_CHECKING:
+    from langgraph.types import StateSnapshot
+
+run_stats = {"completed": 0, "error": 0, "cancelled": 0}
+
+def validate_graph_mode(graph_mode: str) -> str:
+    if graph_mode not in GRAPH_MODES:
+        raise ValueError(f"graph_mode must be one of: {', '.join(GRAPH_MODES)}")
+    return graph_mode
+
+async def execute_workflow(
+    initial_state: Optional[Dict],
+    resume_filename: str,
+    start_time: float,
+    graph_mode: str = "sequential",
+    callback: Optional[Callable] = None,
+    run_id: Optional[str] = None,
+    resume_from: Optional["StateSnapshot"] = None,
+    metadata: Optional[Dict] = None,
+    run_metrics: Optional[RunMetrics] = None,
+    record_cancellation: bool = True
+) -> Dict:
+    """
+    Run the resume agent graph, validate its outputs and persist the result.
+    
+    State is checkpointed under run_id after every node. Pass resume_from (a
+    snapshot from find_resume_checkpoint) instead of initial_state to continue
+    a failed run from its last completed node. Stage timings and token usage
+    are collected into run_metrics (pass one to include earlier stages such
+    as PDF extraction) and stored with the result. A cancelled run is saved
+    as "cancelled" unless record_cancellation is False, as for queue workers
+    whose cancelled jobs are re-claimed and finished by another worker.
+    
+    Returns:
+        The terminal SSE payload: a 'completed' event carrying the result data,
+        or an 'error' event
+    """
+    from .workflow import get_graph
+    
+    run_metrics = run_metrics or RunMetrics()
+    with track_run(run_metrics):
+        run_id = run_id or uuid.uuid4().hex
+        config = {
+            "configurable": {"thread_id": run_id, "callback": callback},
+            "metadata": {"graph_mode": graph_mode, "resume_filename": resume_filename}
+        }
+        if resume_from is not None:
+            config["configurable"]["checkpoint_id"] = resume_from.config["configurable"]["checkpoint_id"]
+        job_description = (initial_state or resume_from.values)["job_description"]
+        resume_text = (initial_state or resume_from.values).get("original_resume")
+    
+        try:
+            final_state = await asyncio.wait_for(get_graph(graph_mode).ainvoke(initial_state, config), timeout=300)
+        except asyncio.TimeoutError:
+            run_stats["error"] += 1
+            return {"status": "error", "message": "Processing timeout - operation took too long", "run_id": run_id}
+        except asyncio.CancelledError:
+            run_stats["cancelled"] += 1
+            if not record_cancellation:
+                raise
+            # The client went away; record the abandoned run before unwinding
+            try:
+                await asyncio.shield(save_workflow_result({
+                    "run_id": run_id,
+                    "job_description": job_description,
+                    "resume_text": resume_text,
+                    "resume_filename": resume_filename,
+                    "processing_time_seconds": time.time() - start_time,
+                    "graph_mode": graph_mode,
+                    "status": "cancelled",
+                    "metrics": run_metrics.to_dict(),
+                    **(metadata or {})
+                }))
+            except Exception as db_error:
+                print(f"Database save error: {db_error}")
+            raise
+        except Exception as e:
+            run_stats["error"] += 1
+            return {"status": "error", "message": str(e), "run_id": run_id}
+    
+        if final_state.get("error"):
+            run_stats["error"] += 1
+            return {"status": "error", "message": final_state["error"], "run_id": run_id}
+    
+        # Validate outputs using Pydantic models
+        try:
+            with stage_timer("output_validation"):
+                job_analysis = JobDescriptionAnalysis(**final_state.get("jd_analysis", {}))
+                tailored_resume = TailoredResume(**final_state.get("tailored_resume", {}))
+                cover_letter = CoverLetter(**final_state.get("cover_letter", {}))
+        
+            final_data = {
+                "job_analysis": job_analysis.model_dump(),
+                "tailored_resume": tailored_resume.model_dump(),
+                "cover_letter": cover_letter.model_dump()
+            }
+            if final_state.get("degraded"):
+                final_data["degraded"] = True
+            if final_state.get("jd_similarity") is not None:
+                final_data["jd_similarity"] = final_state["jd_similarity"]
+        except Exception as validation_error:
+            run_stats["error"] += 1
+            return {"status": "error", "message": f"Output validation failed: {str(validation_error)}", "run_id": run_id}
+    
+        # Save to MongoDB
+        try:
+            workflow_data = {
+                "run_id": run_id,
+                "job_description": job_description,
+                "resume_text": resume_text,
+                "resume_filename": resume_filename,
+                "job_analysis": final_data["job_analysis"],
+                "tailored_resume": final_data["tailored_resume"],
+                "cover_letter": final_data["cover_letter"],
+                "processing_time_seconds": time.time() - start_time,
+                "graph_mode": graph_mode,
+                "status": "completed",
+                "degraded": bool(final_state.get("degraded")),
+                "jd_similarity": final_state.get("jd_similarity"),
+                "metrics": run_metrics.to_dict(),
+                **(metadata or {})
+            }
+            with stage_timer("db_save"):
+                result_id = await save_workflow_result(workflow_data)
+            final_data["database_id"] = result_id
+        except Exception as db_error:
+            print(f"Database save error: {db_error}")
+    
+        # A completed run no longer needs its checkpoints
+        try:
+            await checkpointer.adelete_thread(run_id)
+        except Exception as e:
+            print(f"Checkpoint cleanup error: {e}")
+    
+        run_stats["completed"] += 1
+        return {"status": "completed", "message": "Processing completed", "run_id": run_id, "data": final_data}
+
+# Nodes that can be re-run on their own from a stored result, and the field each one produces
+REGENERABLE_NODES = {
+    "resume_tailor": ("tailored_resume", TailoredResume),
+    "cover_letter_generator": ("cover_letter", CoverLetter)
+}
+
+async def regenerate_node(
+    original: Dict,
+    node: str,
+    options: Optional[Dict] = None,
+    callback: Optional[Callable] = None,
+    run_id: Optional[str] = None,
+    run_metrics: Optional[RunMetrics] = None
+) -> Dict:
+    """
+    Re-run a single node against a stored result and save the output as a new revision.
+    
+    The stored job analysis, tailored resume and resume text stand in for
+    the graph state the earlier nodes produced, so only the chosen node calls
+    the LLM. options (temperature, tone) reach the node through the run
+    config. The new document copies the original, replaces the regenerated
+    field and records revision_of / revision.
+    
+    Returns:
+        The terminal SSE payload, as execute_workflow does
+    """
+    from .workflow.graph import cover_letter_node, resume_tailor_node
+    
+    field, model = REGENERABLE_NODES[node]
+    node_function = {"resume_tailor": resume_tailor_node, "cover_letter_generator": cover_letter_node}[node]
+    run_metrics = run_metrics or RunMetrics()
+    with track_run(run_metrics):
+        run_id = run_id or uuid.uuid4().hex
+        start_time = time.time()
+        state = {
+            "job_description": original.get("job_description"),
+            "original_resume": original.get("resume_text"),
+            "jd_analysis": original.get("job_analysis"),
+            "tailored_resume": original.get("tailored_resume"),
+            "cover_letter": original.get("cover_letter")
+        }
+        config = {"configurable": {"callback": callback, **(options or {})}}
+        
+        try:
+            update = await asyncio.wait_for(node_function(state, config), timeout=300)
+        except asyncio.TimeoutError:
+            run_stats["error"] += 1
+            return {"status": "error", "message": "Processing timeout - operation took too long", "run_id": run_id}
+        if update.get("error"):
+            run_stats["error"] += 1
+            return {"status": "error", "message": update["error"], "run_id": run_id}
+        
+        try:
+            with stage_timer("output_validation"):
+                value = model(**update[field]).model_dump()
+        except Exception as validation_error:
+            run_stats["error"] += 1
+            return {"status": "error", "message": f"Output validation failed: {str(validation_error)}", "run_id": run_id}
+        
+        original_id = str(original["_id"])
+        final_data = {
+            "job_analysis": original.get("job_analysis"),
+            "tailored_resume": original.get("tailored_resume"),
+            "cover_letter": original.get("cover_letter"),
+            field: value,
+            "revision_of": original_id,
+            "regenerated_node": node
+        }
+        try:
+            revision = {key: item for key, item in original.items() if key not in ("_id", "timestamp")}
+            revision.update({
+                "run_id": run_id,
+                field: value,
+                "revision_of": original_id,
+                "revision": original.get("revision", 0) + 1,
+                "regenerated_node": node,
+                "regeneration_options": options or {},
+                "processing_time_seconds": time.time() - start_time,
+                "status": "completed",
+                "metrics": run_metrics.to_dict()
+            })
+            with stage_timer("db_save"):
+                final_data["database_id"] = await save_workflow_result(revision)
+        except Exception as db_error:
+            print(f"Database save error: {db_error}")
+        
+        run_stats["completed"] += 1
+        return {"status": "completed", "message": "Regeneration completed", "run_id": run_id, "data": final_data}
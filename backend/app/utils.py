@@ -2,16 +2,42 @@
 Utility functions for the resume agent API.
 """
 
+import hashlib
 import PyPDF2
 from io import BytesIO
-from typing import Optional
+from typing import Iterator, Optional, Union
 
-def extract_text_from_pdf(pdf_content: bytes) -> str:
+def iter_pdf_pages(source: Union[bytes, str], max_pages: Optional[int] = None) -> Iterator[str]:
     """
-    Extract text content from PDF bytes.
+    Yield the text of a PDF one page at a time.
     
     Args:
-        pdf_content: PDF file content as bytes
+        source: PDF content as bytes, or a path to a PDF file on disk
+        max_pages: Reject documents with more pages than this, if given
+        
+    Yields:
+        Extracted text of each page
+        
+    Raises:
+        ValueError: If the document exceeds max_pages
+    """
+    pdf_stream = BytesIO(source) if isinstance(source, bytes) else open(source, "rb")
+    with pdf_stream:
+        pdf_reader = PyPDF2.PdfReader(pdf_stream)
+        
+        if max_pages is not None and len(pdf_reader.pages) > max_pages:
+            raise ValueError(f"PDF has too many pages (maximum {max_pages})")
+        
+        for page in pdf_reader.pages:
+            yield page.extract_text() or ""
+
+def extract_text_from_pdf(source: Union[bytes, str], max_pages: Optional[int] = None) -> str:
+    """
+    Extract text content from a PDF.
+    
+    Args:
+        source: PDF content as bytes, or a path to a PDF file on disk
+        max_pages: Reject documents with more pages than this, if given
         
     Returns:
         Extracted text content as string
@@ -20,17 +46,12 @@ def extract_text_from_pdf(pdf_content: bytes) -> str:
         ValueError: If PDF processing fails
     """
     try:
-        with BytesIO(pdf_content) as pdf_stream:
-            pdf_reader = PyPDF2.PdfReader(pdf_stream)
-            
-            text_content = ""
-            for page in pdf_reader.pages:
-                text_content += page.extract_text() + "\n"
+        text_content = "\n".join(iter_pdf_pages(source, max_pages))
+        
+        if not text_content.strip():
+            raise ValueError("No text content found in PDF")
             
-            if not text_content.strip():
-                raise ValueError("No text content found in PDF")
-                
-            return text_content.strip()
+        return text_content.strip()
         
     except Exception as e:
         raise ValueError(f"Failed to extract text from PDF: {str(e)}")
@@ -56,4 +77,20 @@ def validate_job_description(job_description: str) -> str:
     if len(cleaned_text) < 50:
         raise ValueError("Job description too short (minimum 50 characters)")
     
-    return cleaned_text
\ No newline at end of file
+    return cleaned_text
+
+def hash_job_description(job_description: str) -> str:
+    """
+    Compute a content hash for a validated job description.
+    
+    Whitespace is collapsed before hashing so postings that differ only in
+    formatting share the same key.
+    
+    Args:
+        job_description: Job description as returned by validate_job_description
+        
+    Returns:
+        Hex-encoded SHA-256 digest of the normalized text
+    """
+    normalized = " ".join(job_description.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
\ No newline at end of file
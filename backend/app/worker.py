@@ -0,0 +1,141 @@
+"""
+Worker process for queued pipeline jobs.
+
+Run one or more of these next to the API with:
+
+    python -m app.worker
+
+Each worker claims jobs from the Mongo-backed queue, runs up to
+WORKER_CONCURRENCY pipelines at a time and persists every progress event,
+so API nodes only enqueue jobs and relay events.
+"""
+
+import asyncio
+import os
+import signal
+import socket
+import time
+import uuid
+from typing import Dict
+
+from .content_store import content_store
+from .database import db_service
+from .jobs import JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, job_queue
+from .pipeline import execute_workflow
+from .workflow.checkpoint import MongoCheckpointSaver, checkpointer
+from .workflow.registry import warm_up
+
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "4"))
+WORKER_POLL_SECONDS = float(os.getenv("WORKER_POLL_SECONDS", "1"))
+
+
+async def _keep_lease(job_id: str, worker_id: str, task: asyncio.Task) -> None:
+    """Renew the job lease until the run finishes; cancel the run if the lease is lost."""
+    while True:
+        await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+        if not await job_queue.renew_lease(job_id, worker_id):
+            task.cancel()
+            return
+
+
+async def run_job(job: Dict, worker_id: str) -> None:
+    """Run one claimed job, persisting its events and final status."""
+    job_id = job["_id"]
+    payload = job["payload"]
+    seq = await job_queue.next_seq(job_id)
+    # Parallel branches and section partials emit concurrently; events are
+    # inserted one at a time so readers following seq never skip one
+    seq_lock = asyncio.Lock()
+
+    async def persist_event(event: Dict) -> None:
+        nonlocal seq
+        async with seq_lock:
+            await job_queue.append_event(job_id, seq, event)
+            seq += 1
+
+    if job["attempts"] > JOB_MAX_ATTEMPTS:
+        result = {"status": "error", "message": "Job failed after maximum attempts", "run_id": job["run_id"]}
+        await persist_event(result)
+        await job_queue.finish(job_id, worker_id, "error")
+        return
+
+    from .workflow import find_resume_checkpoint
+    # A re-claimed job continues from its last checkpoint when one survives
+    resume_from = await find_resume_checkpoint(job["run_id"]) if job["attempts"] > 1 else None
+    await persist_event({"status": "started", "message": "Processing started", "run_id": job["run_id"]})
+
+    initial_state = None if resume_from else {
+        "messages": [],
+        "job_description": payload["job_description"],
+        "original_resume": payload["resume_text"]
+    }
+    run = asyncio.create_task(execute_workflow(
+        initial_state,
+        payload["resume_filename"],
+        time.time(),
+        payload.get("graph_mode", "sequential"),
+        callback=persist_event,
+        run_id=job["run_id"],
+        resume_from=resume_from,
+        metadata={"job_id": job_id},
+        # Lease loss and shutdown hand the job to another worker, which saves its result
+        record_cancellation=False
+    ))
+    lease = asyncio.create_task(_keep_lease(job_id, worker_id, run))
+    try:
+        result = await run
+    except asyncio.CancelledError:
+        # Lease lost to another worker, or this worker is shutting down
+        return
+    finally:
+        lease.cancel()
+
+    await persist_event(result)
+    await job_queue.finish(job_id, worker_id, result["status"], result.get("data"))
+
+
+async def main() -> None:
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    await db_service.connect()
+    content_store.start()
+    await job_queue.setup()
+    if isinstance(checkpointer, MongoCheckpointSaver):
+        await checkpointer.setup()
+    warm_up()
+    print(f"Worker {worker_id} started")
+
+    slots = asyncio.Semaphore(WORKER_CONCURRENCY)
+    running = set()
+    try:
+        while not stopping.is_set():
+            await slots.acquire()
+            job = await job_queue.claim(worker_id)
+            if job is None:
+                slots.release()
+                try:
+                    await asyncio.wait_for(stopping.wait(), timeout=WORKER_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            task = asyncio.create_task(run_job(job, worker_id))
+            running.add(task)
+            task.add_done_callback(running.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+        # Let in-flight jobs finish; unfinished ones are re-claimed after their lease expires
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+    finally:
+        await content_store.drain()
+        await db_service.disconnect()
+        print(f"Worker {worker_id} stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,14 +1,27 @@
 from .config import create_llm, get_schema_string, handle_callback
 from .models import JobDescriptionAnalysis, TailoredResume, CoverLetter, ResumeSection
-from .graph import resume_agent
+from .registry import GRAPH_MODES, get_graph, get_llm, warm_up
+
+def __getattr__(name):
+    # The graph module pulls in LangGraph and every agent; import it on first use
+    if name in ('resume_agent', 'resume_agent_parallel', 'find_resume_checkpoint'):
+        from . import graph
+        return getattr(graph, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
-    'create_llm', 
-    'get_schema_string', 
+    'create_llm',
+    'get_schema_string',
     'handle_callback',
-    'JobDescriptionAnalysis', 
-    'TailoredResume', 
-    'CoverLetter', 
+    'JobDescriptionAnalysis',
+    'TailoredResume',
+    'CoverLetter',
     'ResumeSection',
-    'resume_agent'
-]
\ No newline at end of file
+    'resume_agent',
+    'resume_agent_parallel',
+    'get_graph',
+    'get_llm',
+    'warm_up',
+    'find_resume_checkpoint',
+    'GRAPH_MODES'
+]
@@ -6,70 +6,52 @@ and job description analysis, emphasizing key skills and achievements.
 """
 
 import os
-import json
 import sys
-from typing import Dict
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
 
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
 
 from ..models import CoverLetter
 from ..prompts import get_cover_letter_prompt
-from ..config import create_llm, get_schema_string
-
-# Initialize LLM
-llm = create_llm(temperature=0.4)
-
-def extract_candidate_info(tailored_resume: Dict) -> Dict:
-    """Extract candidate information from tailored resume."""
-    sections = tailored_resume.get("sections", [])
-    candidate_info = {
-        "name": "Candidate",
-        "experience": [],
-        "skills": tailored_resume.get("highlighted_skills", []),
-        "education": "",
-        "projects": []
-    }
-    
-    for section in sections:
-        title = section.get("title", "").lower()
-        content = section.get("content", "")
-        
-        if "experience" in title:
-            candidate_info["experience"].append(content)
-        elif "education" in title:
-            candidate_info["education"] = content
-        elif "project" in title:
-            candidate_info["projects"].append(content)
-    
-    return candidate_info
+from ..config import get_schema_string
+from ..registry import get_llm
+from ..streaming import stream_llm_response
+from ..output_repair import validate_output
+from ..prompt_assembly import PromptAssembler, template_tokens
+from ..skill_matcher import get_skill_matcher
 
 def calculate_word_count(text: str) -> int:
     """Calculate approximate word count of text."""
     return len(text.split())
 
-class CoverLetterGeneratorAgent:
-    """Agent for generating personalized cover letters."""
-    
-    def __init__(self):
-        self.llm = llm
-        self.parser = JsonOutputParser(pydantic_object=CoverLetter)
-        schema_str = get_schema_string(CoverLetter)
-        
-        self.prompt = ChatPromptTemplate([
-            ("system", get_cover_letter_prompt(schema_str)),
-            ("human", """Generate cover letter:
+@lru_cache(maxsize=None)
+def build_prompt() -> Tuple[ChatPromptTemplate, int]:
+    """Build the prompt template and its fixed token count once, on first use."""
+    prompt = ChatPromptTemplate([
+        ("system", get_cover_letter_prompt(get_schema_string(CoverLetter))),
+        ("human", """Generate cover letter:
 
+CANDIDATE NAME: {candidate_name}
 TAILORED RESUME: {tailored_resume}
 JOB ANALYSIS: {jd_analysis}
 ESTABLISHED SKILLS: {established_skills}
 LEARNING SKILLS: {learning_skills}
 SOFT SKILLS: {soft_skills}
+TONE: {tone}
 Match score: {match_score}%""")
-        ])
+    ])
+    return prompt, template_tokens(prompt)
+
+class CoverLetterGeneratorAgent:
+    """Agent for generating personalized cover letters."""
     
-    async def generate_cover_letter_async(self, tailored_resume: Dict, jd_analysis: Dict) -> Dict:
-        """Async version of generate_cover_letter."""
+    def __init__(self, temperature: Optional[float] = None):
+        self.llm = get_llm("cover_letter_generator", temperature)
+        self.prompt, self.template_tokens = build_prompt()
+    
+    async def generate_cover_letter_async(self, tailored_resume: Dict, jd_analysis: Dict, callback: Optional[Callable] = None, candidate_name: Optional[str] = None, tone: Optional[str] = None) -> Dict:
+        """Async version of generate_cover_letter. candidate_name comes from the parsed original resume."""
         if not tailored_resume:
             raise ValueError("Tailored resume cannot be empty")
         
@@ -77,40 +59,49 @@ Match score: {match_score}%""")
             raise ValueError("Job description analysis cannot be empty")
         
         try:
-            # Extract candidate information
-            candidate_info = extract_candidate_info(tailored_resume)
-            
             # Get highlighted skills and match score
             highlighted_skills = tailored_resume.get("highlighted_skills", [])
             match_score = tailored_resume.get("match_score", 0)
             
             # Analyze skills context
             tailoring_notes = tailored_resume.get("tailoring_notes", [])
-            learning_skills = [skill for skill in highlighted_skills if any("learning" in note.lower() and skill.lower() in note.lower() for note in tailoring_notes)]
+            matcher = get_skill_matcher(highlighted_skills)
+            noted_as_learning = set()
+            for note in tailoring_notes:
+                if "learning" in note.lower():
+                    noted_as_learning |= matcher.matched_skills(note)
+            learning_skills = [skill for skill in highlighted_skills if skill in noted_as_learning]
             established_skills = [skill for skill in highlighted_skills if skill not in learning_skills]
             soft_skills = jd_analysis.get("soft_skills", [])
             
-            # Generate cover letter using LLM
-            response = await self.llm.ainvoke(self.prompt.format_messages(
-                tailored_resume=json.dumps(tailored_resume, indent=2),
-                jd_analysis=json.dumps(jd_analysis, indent=2),
-                candidate_info=json.dumps(candidate_info, indent=2),
-                highlighted_skills=", ".join(highlighted_skills),
-                learning_skills=", ".join(learning_skills),
-                established_skills=", ".join(established_skills),
-                soft_skills=", ".join(soft_skills),
-                match_score=match_score
-            ))
+            # Skills and match score are passed on their own, so the resume and
+            # job analysis segments carry only what those lines do not
+            resume_context = {k: v for k, v in tailored_resume.items() if k not in ("highlighted_skills", "match_score")}
+            jd_context = {k: v for k, v in jd_analysis.items() if k != "soft_skills"}
+            values, _ = (
+                PromptAssembler("cover_letter_generator", self.template_tokens)
+                .add("candidate_name", candidate_name or "Not provided", priority=9, required=True)
+                .add("tailored_resume", resume_context, priority=10, required=True)
+                .add("jd_analysis", jd_context, priority=8, required=True)
+                .add("established_skills", ", ".join(established_skills), priority=9)
+                .add("learning_skills", ", ".join(learning_skills), priority=9)
+                .add("soft_skills", ", ".join(soft_skills), priority=6)
+                .add("match_score", str(match_score), priority=9, required=True)
+                .add("tone", tone or "professional", priority=9, required=True)
+                .build()
+            )
             
-            # Parse the response
-            parsed_response = self.parser.invoke(response.content)
+            # Generate cover letter using LLM
+            messages = self.prompt.format_messages(**values)
+            content = await stream_llm_response(self.llm, messages, callback, "cover_letter_generator", CoverLetter)
             
-            # Calculate word count
-            full_text = f"{parsed_response['opening_paragraph']} {' '.join(parsed_response['body_paragraphs'])} {parsed_response['closing_paragraph']}"
-            parsed_response['word_count'] = calculate_word_count(full_text)
+            def add_word_count(parsed_response: Dict) -> Dict:
+                full_text = f"{parsed_response['opening_paragraph']} {' '.join(parsed_response['body_paragraphs'])} {parsed_response['closing_paragraph']}"
+                parsed_response['word_count'] = calculate_word_count(full_text)
+                return parsed_response
             
-            # Validate and return
-            cover_letter = CoverLetter(**parsed_response)
+            # Validate, repairing only broken fields, and return
+            cover_letter = await validate_output(self.llm, messages, content, CoverLetter, "cover_letter_generator", add_word_count)
             return cover_letter.model_dump()
             
         except Exception as e:
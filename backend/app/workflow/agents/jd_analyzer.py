@@ -8,53 +8,61 @@ without LangGraph for use as a node in multiagent systems.
 
 import os
 import sys
-import json
-from typing import Dict
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
 
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 
 from ..models import JobDescriptionAnalysis
 from ..prompts import get_jd_analyzer_prompt
-from ..config import create_llm, get_schema_string
+from ..config import get_schema_string
+from ..registry import get_llm
+from ..streaming import stream_llm_response
+from ..output_repair import validate_output
+from ..prompt_assembly import PromptAssembler, template_tokens
 
-# Initialize components 
-llm = create_llm(temperature=0.1)
-
-parser = JsonOutputParser(pydantic_object=JobDescriptionAnalysis)
-
-schema_str = json.dumps(JobDescriptionAnalysis.model_json_schema(), indent=2).replace("{", "{{").replace("}", "}}")
-system_prompt = get_jd_analyzer_prompt(schema_str)
-
-prompt_template = ChatPromptTemplate([
-    ("system", system_prompt),
-    ("human", "Analyze this job description: {job_description}"),
-])
+@lru_cache(maxsize=None)
+def build_prompt() -> Tuple[ChatPromptTemplate, int]:
+    """Build the prompt template and its fixed token count once, on first use."""
+    prompt_template = ChatPromptTemplate([
+        ("system", get_jd_analyzer_prompt(get_schema_string(JobDescriptionAnalysis))),
+        ("human", "Analyze this job description: {job_description}"),
+    ])
+    return prompt_template, template_tokens(prompt_template)
 
 class JDAnalyzerAgent:
     """Job Description Analyzer Agent."""
     
-    def __init__(self):
-        self.llm = llm
-        self.parser = parser
-        self.prompt = prompt_template
+    def __init__(self, temperature: Optional[float] = None):
+        self.llm = get_llm("jd_analyzer", temperature)
+        self.parser = JsonOutputParser(pydantic_object=JobDescriptionAnalysis)
+        self.prompt, self.template_tokens = build_prompt()
+    
+    def _format_messages(self, job_description: str):
+        values, _ = (
+            PromptAssembler("jd_analyzer", self.template_tokens)
+            .add("job_description", job_description, priority=10, required=True)
+            .build()
+        )
+        return self.prompt.format_messages(**values)
     
     def analyze_job_description(self, job_description: str) -> Dict:
         """Analyze job description and return structured data."""
         try:
-            response = self.llm.invoke(self.prompt.format_messages(job_description=job_description))
+            response = self.llm.invoke(self._format_messages(job_description))
             parsed_response = self.parser.invoke(response.content)
             validated_analysis = JobDescriptionAnalysis(**parsed_response)
             return validated_analysis.model_dump()
         except Exception as e:
             return {"error": str(e)}
     
-    async def analyze_job_description_async(self, job_description: str) -> Dict:
-        """Async version of job description analysis."""
+    async def analyze_job_description_async(self, job_description: str, callback: Optional[Callable] = None) -> Dict:
+        """Async version of job description analysis, streaming completed fields to callback."""
         try:
-            response = await self.llm.ainvoke(self.prompt.format_messages(job_description=job_description))
-            parsed_response = self.parser.invoke(response.content)
-            validated_analysis = JobDescriptionAnalysis(**parsed_response)
+            messages = self._format_messages(job_description)
+            content = await stream_llm_response(self.llm, messages, callback, "jd_analyzer", JobDescriptionAnalysis)
+            validated_analysis = await validate_output(self.llm, messages, content, JobDescriptionAnalysis, "jd_analyzer")
             return validated_analysis.model_dump()
         except Exception as e:
             return {"error": str(e)}
@@ -5,52 +5,42 @@ A streamlined agent that tailors resumes to job requirements.
 """
 
 import os
-import json
-import re
-from typing import Dict, List
+import asyncio
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
 
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
 
-from ..models import ResumeSection, TailoredResume
-from ..prompts import get_resume_tailor_prompt
-from ..config import create_llm, get_schema_string
+from ..models import ResumeSection, TailoredResume, TailoredSection
+from ..prompts import get_resume_tailor_prompt, get_section_tailor_prompt
+from ..config import get_schema_string, handle_callback
+from ..registry import get_llm
+from ..streaming import stream_llm_response
+from ..output_repair import validate_output
+from ..prompt_assembly import PromptAssembler, count_tokens, template_tokens
+from ..skill_matcher import get_skill_matcher
+from ..resume_parser import parse_resume
 
-# Initialize LLM
-llm = create_llm(temperature=0.3)
+# "single" tailors the whole resume in one completion, "sections" tailors each
+# section concurrently and merges them, "auto" picks sections for long resumes
+RESUME_TAILOR_MODE = os.getenv("RESUME_TAILOR_MODE", "auto")
+RESUME_TAILOR_SECTIONS_MIN_TOKENS = int(os.getenv("RESUME_TAILOR_SECTIONS_MIN_TOKENS", "1500"))
+RESUME_TAILOR_SECTION_CONCURRENCY = int(os.getenv("RESUME_TAILOR_SECTION_CONCURRENCY", "4"))
+# Sections shorter than this are kept as they are instead of costing an LLM call
+RESUME_TAILOR_SECTION_MIN_CHARS = int(os.getenv("RESUME_TAILOR_SECTION_MIN_CHARS", "80"))
+MAX_TAILORING_NOTES = 10
+# Title of the section holding the lines above the first heading in section-by-section tailoring
+PREAMBLE_TITLE = "CONTACT"
 
 def extract_sections(text: str) -> List[ResumeSection]:
-    """Extract resume sections."""
-    sections = []
-    pattern = r'^\s*(EXPERIENCE|EDUCATION|SKILLS|PROJECTS|SUMMARY|INTERNSHIPS|EXTRACURRICULAR|CERTIFICATIONS)\s*$'
-    
-    lines = text.split('\n')
-    current_section = None
-    current_content = []
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        if re.match(pattern, line, re.IGNORECASE):
-            if current_section and current_content:
-                sections.append(ResumeSection(title=current_section, content='\n'.join(current_content)))
-            current_section = line
-            current_content = []
-        elif current_section:
-            current_content.append(line)
-    
-    if current_section and current_content:
-        sections.append(ResumeSection(title=current_section, content='\n'.join(current_content)))
-    
-    return sections
+    """Extract resume sections from the cached structured parse."""
+    return parse_resume(text).to_sections()
 
 def analyze_skills(resume_text: str, required_skills: List[str]) -> Dict:
-    """Analyze skill matching."""
-    resume_lower = resume_text.lower()
-    matched = [skill for skill in required_skills if skill.lower() in resume_lower]
-    missing = [skill for skill in required_skills if skill.lower() not in resume_lower]
+    """Analyze skill matching, counting synonyms (e.g. k8s for Kubernetes) as matches."""
+    found = get_skill_matcher(required_skills).matched_skills(resume_text)
+    matched = [skill for skill in required_skills if skill in found]
+    missing = [skill for skill in required_skills if skill not in found]
     match_percentage = (len(matched) / len(required_skills) * 100) if required_skills else 0
     
     return {
@@ -59,51 +49,168 @@ def analyze_skills(resume_text: str, required_skills: List[str]) -> Dict:
         "match_percentage": match_percentage
     }
 
+@lru_cache(maxsize=None)
+def build_prompt() -> Tuple[ChatPromptTemplate, int]:
+    """Build the prompt template and its fixed token count once, on first use."""
+    prompt = ChatPromptTemplate([
+        ("system", get_resume_tailor_prompt(get_schema_string(TailoredResume))),
+        ("human", "Tailor this resume:\n\nRESUME:\n{resume}\n\nJOB ANALYSIS:\n{job_analysis}\n\nSKILL ANALYSIS:\n{skill_analysis}\n\nSECTIONS:\n{sections}")
+    ])
+    return prompt, template_tokens(prompt)
+
+@lru_cache(maxsize=None)
+def build_section_prompt() -> Tuple[ChatPromptTemplate, int]:
+    """Build the single-section prompt template and its fixed token count once, on first use."""
+    prompt = ChatPromptTemplate([
+        ("system", get_section_tailor_prompt(get_schema_string(TailoredSection))),
+        ("human", "Tailor this resume section:\n\nSECTION TITLE: {title}\n\nSECTION CONTENT:\n{content}\n\nJOB ANALYSIS:\n{job_analysis}\n\nSKILL ANALYSIS:\n{skill_analysis}")
+    ])
+    return prompt, template_tokens(prompt)
+
+def use_section_mode(original_resume: str, mode: Optional[str] = None) -> bool:
+    """Decide whether to tailor section by section; mode overrides RESUME_TAILOR_MODE."""
+    mode = mode or RESUME_TAILOR_MODE
+    if mode == "single":
+        return False
+    sections = parse_resume(original_resume).sections
+    if mode == "sections":
+        return bool(sections)
+    # Output generation dominates on long resumes, and only pays off split across sections
+    return len(sections) >= 2 and count_tokens(original_resume) >= RESUME_TAILOR_SECTIONS_MIN_TOKENS
 
 
 class ResumeTailorAgent:
     """Simplified resume tailoring agent."""
     
-    def __init__(self):
-        self.parser = JsonOutputParser(pydantic_object=TailoredResume)
-        schema_str = get_schema_string(TailoredResume)
-        
-        self.prompt = ChatPromptTemplate([
-            ("system", get_resume_tailor_prompt(schema_str)),
-            ("human", "Tailor this resume:\n\nRESUME:\n{resume}\n\nJOB ANALYSIS:\n{job_analysis}\n\nSKILL ANALYSIS:\n{skill_analysis}\n\nSECTIONS:\n{sections}")
-        ])
+    def __init__(self, temperature: Optional[float] = None):
+        self.llm = get_llm("resume_tailor", temperature)
+        self.prompt, self.template_tokens = build_prompt()
+        self.section_prompt, self.section_template_tokens = build_section_prompt()
     
-    async def tailor_resume_async(self, original_resume: str, jd_analysis: Dict) -> Dict:
-        """Async version of tailor_resume."""
+    async def tailor_resume_async(self, original_resume: str, jd_analysis: Dict, callback: Optional[Callable] = None) -> Dict:
+        """Async version of tailor_resume. Section titles come from the cached parse of the resume."""
         if not original_resume or not original_resume.strip():
             raise ValueError("Original resume cannot be empty")
         
         if not jd_analysis:
             raise ValueError("Job description analysis cannot be empty")
         
-        try:
-            # Extract sections for context
-            sections = extract_sections(original_resume)
-            
-            # Analyze skills for context
-            hard_skills = jd_analysis.get("hard_skills", [])
-            soft_skills = jd_analysis.get("soft_skills", [])
-            all_skills = hard_skills + soft_skills
-            skill_analysis = analyze_skills(original_resume, all_skills)
-            
-            # AI-powered tailoring
-            response = await llm.ainvoke(self.prompt.format_messages(
-                resume=original_resume,
-                job_analysis=json.dumps(jd_analysis, indent=2),
-                skill_analysis=json.dumps(skill_analysis, indent=2),
-                sections=json.dumps([{"title": s.title, "content": s.content} for s in sections], indent=2)
-            ))
-            
-            parsed_response = self.parser.invoke(response.content)
-            validated_resume = TailoredResume(**parsed_response)
-            
-            return validated_resume.model_dump()
-            
-        except Exception as e:
-            raise ValueError(f"Resume tailoring failed: {str(e)}")
+        # Section titles for context, from the parse cached by resume hash
+        parsed = parse_resume(original_resume)
+        section_titles = [parsed.slice(s.heading) for s in parsed.sections]
+        
+        # Analyze skills for context
+        hard_skills = jd_analysis.get("hard_skills", [])
+        soft_skills = jd_analysis.get("soft_skills", [])
+        all_skills = hard_skills + soft_skills
+        skill_analysis = analyze_skills(original_resume, all_skills)
+        
+        # The resume text already carries every section's content, so only
+        # the detected section titles are sent alongside it
+        values, _ = (
+            PromptAssembler("resume_tailor", self.template_tokens)
+            .add("resume", original_resume, priority=10, required=True)
+            .add("job_analysis", jd_analysis, priority=8, required=True)
+            .add("skill_analysis", skill_analysis, priority=5)
+            .add("sections", section_titles, priority=2)
+            .build()
+        )
+        
+        # AI-powered tailoring
+        messages = self.prompt.format_messages(**values)
+        content = await stream_llm_response(self.llm, messages, callback, "resume_tailor", TailoredResume)
+        validated_resume = await validate_output(self.llm, messages, content, TailoredResume, "resume_tailor")
+        
+        return validated_resume.model_dump()
 
+    
+    async def _tailor_section(self, section: ResumeSection, job_analysis: Dict, skill_analysis: Dict) -> Dict:
+        values, _ = (
+            PromptAssembler("resume_tailor", self.section_template_tokens)
+            .add("title", section.title, priority=10, required=True)
+            .add("content", section.content, priority=10, required=True)
+            .add("job_analysis", job_analysis, priority=8, required=True)
+            .add("skill_analysis", skill_analysis, priority=5)
+            .build()
+        )
+        messages = self.section_prompt.format_messages(**values)
+        content = await stream_llm_response(self.llm, messages, None, "resume_tailor")
+        tailored = await validate_output(self.llm, messages, content, TailoredSection, "resume_tailor")
+        # The merged resume keeps the original headings, whatever the model returned
+        return {"title": section.title, "content": tailored.content, "notes": tailored.notes}
+    
+    async def tailor_sections_async(self, original_resume: str, jd_analysis: Dict, callback: Optional[Callable] = None) -> Dict:
+        """
+        Tailor each section in its own completion, concurrently, and merge the results.
+        
+        At most RESUME_TAILOR_SECTION_CONCURRENCY sections are in flight, and
+        each one is sent to the callback as a "partial" sections event as soon
+        as it is done. The reduce step is local: highlighted_skills and
+        match_score come from matching the job's skills against the tailored
+        text, and tailoring_notes from the per-section notes. The lines above
+        the first heading (name and contact details) are kept as a leading
+        CONTACT section. A section whose call fails keeps its original
+        content; tailoring fails only if every call does.
+        """
+        if not original_resume or not original_resume.strip():
+            raise ValueError("Original resume cannot be empty")
+        
+        if not jd_analysis:
+            raise ValueError("Job description analysis cannot be empty")
+        
+        parsed = parse_resume(original_resume)
+        sections = parsed.to_sections()
+        # Name and contact details above the first heading are carried through unchanged
+        preamble = parsed.preamble()
+        if preamble:
+            sections.insert(0, ResumeSection(title=PREAMBLE_TITLE, content=preamble))
+        all_skills = jd_analysis.get("hard_skills", []) + jd_analysis.get("soft_skills", [])
+        skill_analysis = analyze_skills(original_resume, all_skills)
+        # Each section only needs what the role asks for, not the whole analysis
+        job_analysis = {
+            key: jd_analysis.get(key)
+            for key in ("role_title", "hard_skills", "soft_skills", "responsibilities", "experience_level")
+        }
+        semaphore = asyncio.Semaphore(RESUME_TAILOR_SECTION_CONCURRENCY)
+        errors = []
+        
+        async def tailor(index: int, section: ResumeSection) -> Dict:
+            if section.title == PREAMBLE_TITLE or len(section.content) < RESUME_TAILOR_SECTION_MIN_CHARS:
+                result = {"title": section.title, "content": section.content, "notes": []}
+            else:
+                try:
+                    async with semaphore:
+                        result = await self._tailor_section(section, job_analysis, skill_analysis)
+                except Exception as e:
+                    errors.append(e)
+                    result = {"title": section.title, "content": section.content, "notes": [f"{section.title} kept as in the original resume"]}
+            await handle_callback(callback, {
+                "status": "partial", "agent": "resume_tailor", "field": "sections", "index": index,
+                "value": {"title": result["title"], "content": result["content"]}
+            })
+            return result
+        
+        results = await asyncio.gather(*(tailor(index, section) for index, section in enumerate(sections)))
+        attempted = sum(
+            section.title != PREAMBLE_TITLE and len(section.content) >= RESUME_TAILOR_SECTION_MIN_CHARS
+            for section in sections
+        )
+        if attempted and len(errors) == attempted:
+            # The graph node adds the "Resume tailoring failed" prefix
+            raise errors[0]
+        
+        tailored_text = "\n".join(result["content"] for result in results)
+        final_skills = analyze_skills(tailored_text, all_skills)
+        notes = []
+        for result in results:
+            for note in result["notes"]:
+                if note not in notes:
+                    notes.append(note)
+        
+        tailored_resume = TailoredResume(
+            sections=[ResumeSection(title=result["title"], content=result["content"]) for result in results],
+            highlighted_skills=final_skills["matched_skills"],
+            match_score=round(final_skills["match_percentage"], 1),
+            tailoring_notes=notes[:MAX_TAILORING_NOTES]
+        )
+        return tailored_resume.model_dump()
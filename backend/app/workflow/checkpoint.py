@@ -0,0 +1,265 @@
+"""
+Checkpoint storage for resumable pipeline runs.
+
+The compiled graphs persist their state after every node so a run that
+fails or times out can continue from the last completed node instead of
+re-running every agent. CHECKPOINT_STORE selects the backend: "memory"
+keeps checkpoints in the process, "mongo" stores them next to
+workflow_results so any worker can resume a run. Both forget runs left
+unfinished once CHECKPOINT_TTL_SECONDS have passed.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+from ..database import db_service
+
+CHECKPOINT_STORE = os.getenv("CHECKPOINT_STORE", "memory")
+CHECKPOINT_TTL_SECONDS = int(os.getenv("CHECKPOINT_TTL_SECONDS", str(7 * 24 * 3600)))
+# Runs the in-process store keeps checkpoints for; the least recently updated are dropped first
+CHECKPOINT_MEMORY_MAX_THREADS = int(os.getenv("CHECKPOINT_MEMORY_MAX_THREADS", "1000"))
+
+
+class RetainingMemorySaver(InMemorySaver):
+    """
+    In-process checkpoint saver that forgets runs nobody can resume any more.
+
+    Completed runs delete their own checkpoints, but failed, timed-out and
+    cancelled runs keep theirs so they can be resumed. Those are dropped once
+    idle for CHECKPOINT_TTL_SECONDS, like the Mongo TTL index, or when more
+    than CHECKPOINT_MEMORY_MAX_THREADS runs are held.
+    """
+
+    def __init__(self, max_threads: int = CHECKPOINT_MEMORY_MAX_THREADS, ttl: float = CHECKPOINT_TTL_SECONDS):
+        super().__init__()
+        self.max_threads = max_threads
+        self.ttl = ttl
+        # Thread id -> last write time, least recently written first
+        self._touched: "OrderedDict[str, float]" = OrderedDict()
+
+    def _touch(self, config: RunnableConfig) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        now = time.monotonic()
+        self._touched[thread_id] = now
+        self._touched.move_to_end(thread_id)
+        while self._touched:
+            oldest, touched_at = next(iter(self._touched.items()))
+            if oldest == thread_id or (len(self._touched) <= self.max_threads and now - touched_at < self.ttl):
+                break
+            self.delete_thread(oldest)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        self._touch(config)
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        self._touch(config)
+        return super().put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._touched.pop(thread_id, None)
+        super().delete_thread(thread_id)
+
+
+class MongoCheckpointSaver(BaseCheckpointSaver):
+    """
+    Async checkpoint saver backed by the application's MongoDB database.
+
+    Checkpoints are serialized whole with the saver's serde; pending writes are
+    stored one document per channel write so a partially completed superstep
+    is not re-run on resume. Only the async interface is implemented.
+    """
+
+    def __init__(self, database=db_service):
+        super().__init__()
+        self.database = database
+
+    @property
+    def checkpoints(self):
+        return self.database.db.checkpoints
+
+    @property
+    def writes(self):
+        return self.database.db.checkpoint_writes
+
+    async def setup(self) -> None:
+        """Create lookup and expiry indexes; called once the database is connected."""
+        await self.checkpoints.create_index(
+            [("thread_id", 1), ("checkpoint_ns", 1), ("checkpoint_id", -1)], unique=True
+        )
+        await self.writes.create_index(
+            [("thread_id", 1), ("checkpoint_ns", 1), ("checkpoint_id", 1), ("task_id", 1), ("idx", 1)], unique=True
+        )
+        for collection in (self.checkpoints, self.writes):
+            await collection.create_index("created_at", expireAfterSeconds=CHECKPOINT_TTL_SECONDS)
+
+    async def _load_tuple(self, doc: Dict) -> CheckpointTuple:
+        thread_id = doc["thread_id"]
+        checkpoint_ns = doc["checkpoint_ns"]
+        checkpoint_id = doc["checkpoint_id"]
+
+        pending_writes = []
+        cursor = self.writes.find(
+            {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}
+        ).sort([("task_id", 1), ("idx", 1)])
+        async for write in cursor:
+            pending_writes.append(
+                (write["task_id"], write["channel"], self.serde.loads_typed((write["type"], write["value"])))
+            )
+
+        parent_id = doc.get("parent_checkpoint_id")
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=self.serde.loads_typed((doc["type"], doc["checkpoint"])),
+            metadata=self.serde.loads_typed((doc["metadata_type"], doc["metadata"])),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+            pending_writes=pending_writes,
+        )
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        query = {
+            "thread_id": config["configurable"]["thread_id"],
+            "checkpoint_ns": config["configurable"].get("checkpoint_ns", ""),
+        }
+        if checkpoint_id := get_checkpoint_id(config):
+            query["checkpoint_id"] = checkpoint_id
+
+        # Checkpoint ids are time-ordered, so the highest id is the latest
+        doc = await self.checkpoints.find_one(query, sort=[("checkpoint_id", -1)])
+        return await self._load_tuple(doc) if doc else None
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        query: Dict[str, Any] = {}
+        if config:
+            query["thread_id"] = config["configurable"]["thread_id"]
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                query["checkpoint_ns"] = checkpoint_ns
+            if checkpoint_id := get_checkpoint_id(config):
+                query["checkpoint_id"] = checkpoint_id
+        if before and (before_id := get_checkpoint_id(before)):
+            query["checkpoint_id"] = {"$lt": before_id}
+
+        remaining = limit
+        async for doc in self.checkpoints.find(query).sort("checkpoint_id", -1):
+            checkpoint_tuple = await self._load_tuple(doc)
+            if filter and not all(checkpoint_tuple.metadata.get(k) == v for k, v in filter.items()):
+                continue
+            yield checkpoint_tuple
+            if remaining is not None:
+                remaining -= 1
+                if remaining <= 0:
+                    break
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_type, checkpoint_bytes = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_bytes = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        await self.checkpoints.update_one(
+            {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]},
+            {"$set": {
+                "parent_checkpoint_id": config["configurable"].get("checkpoint_id"),
+                "type": checkpoint_type,
+                "checkpoint": checkpoint_bytes,
+                "metadata_type": metadata_type,
+                "metadata": metadata_bytes,
+                "created_at": datetime.now(timezone.utc)
+            }},
+            upsert=True
+        )
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        base = {
+            "thread_id": config["configurable"]["thread_id"],
+            "checkpoint_ns": config["configurable"].get("checkpoint_ns", ""),
+            "checkpoint_id": config["configurable"]["checkpoint_id"],
+            "task_id": task_id,
+        }
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            value_type, value_bytes = self.serde.dumps_typed(value)
+            fields = {
+                "channel": channel,
+                "type": value_type,
+                "value": value_bytes,
+                "task_path": task_path,
+                "created_at": datetime.now(timezone.utc)
+            }
+            # Regular writes are idempotent; special channels (errors, interrupts) overwrite
+            update = {"$setOnInsert": fields} if write_idx >= 0 else {"$set": fields}
+            await self.writes.update_one({**base, "idx": write_idx}, update, upsert=True)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self.checkpoints.delete_many({"thread_id": thread_id})
+        await self.writes.delete_many({"thread_id": thread_id})
+
+
+def create_checkpointer() -> BaseCheckpointSaver:
+    """Create the checkpoint saver selected by CHECKPOINT_STORE."""
+    if CHECKPOINT_STORE == "mongo":
+        return MongoCheckpointSaver()
+    if CHECKPOINT_STORE == "memory":
+        return RetainingMemorySaver()
+    raise ValueError(f"Unknown CHECKPOINT_STORE: {CHECKPOINT_STORE}")
+
+
+checkpointer = create_checkpointer()
@@ -8,7 +8,8 @@ import json
 from typing import Type, Optional, Callable, Dict
 from dotenv import load_dotenv
 from pydantic import BaseModel
-from langchain_google_genai import ChatGoogleGenerativeAI
+
+from .scheduler import ScheduledLLM, llm_scheduler
 
 # Load environment 
 load_dotenv()
@@ -17,12 +18,20 @@ load_dotenv()
 os.environ["LANGSMITH_API_KEY"] = os.getenv("LANGSMITH_API_KEY", "")
 os.environ["LANGSMITH_TRACING"] = "true"
 
-def create_llm(temperature: float = 0.1) -> ChatGoogleGenerativeAI:
-    """Create a ChatGoogleGenerativeAI instance with consistent configuration."""
-    return ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash",
-        temperature=temperature,
-        google_api_key=os.getenv("GOOGLE_API_KEY")
+def create_llm(temperature: float = 0.1) -> ScheduledLLM:
+    """Create a ChatGoogleGenerativeAI instance with consistent configuration, routed through the shared scheduler."""
+    # Deferred: the Gemini client is slow to import and only needed once a run starts
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ScheduledLLM(
+        ChatGoogleGenerativeAI(
+            model="gemini-2.0-flash",
+            temperature=temperature,
+            google_api_key=os.getenv("GOOGLE_API_KEY"),
+            # The scheduler owns retries and rate-limit backoff; retries inside
+            # the client would multiply with its attempts
+            max_retries=0
+        ),
+        llm_scheduler
     )
 
 def get_schema_string(model: Type[BaseModel]) -> str:
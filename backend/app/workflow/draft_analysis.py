@@ -0,0 +1,152 @@
+"""
+Rule-based "instant draft" job description analysis.
+
+draft_job_analysis fills a JobDescriptionAnalysis from the posting in a few
+milliseconds without calling the LLM: skills come from a lexicon matched by
+the compiled skill matcher, responsibilities from bullets under
+responsibility-style headings, and the remaining fields from keyword
+heuristics. The graph sends it to clients as an early "draft" event, and
+uses it in place of the LLM analysis when the scheduler is saturated.
+"""
+
+import re
+from typing import Dict, List
+
+from .models import JobDescriptionAnalysis
+from .skill_matcher import get_skill_matcher
+
+HARD_SKILL_LEXICON = (
+    "Python", "Java", "C++", "C#", "Rust", "Ruby", "PHP", "Kotlin", "Swift", "Scala", "R",
+    "JavaScript", "TypeScript", "HTML", "CSS", "SQL", "NoSQL", "Bash",
+    "React", "Angular", "Vue.js", "Node.js", "Next.js", "Django", "Flask", "FastAPI", "Spring Boot",
+    ".NET", "Ruby on Rails", "GraphQL", "REST", "gRPC", "Microservices",
+    "Docker", "Kubernetes", "Terraform", "Ansible", "Linux", "Git", "CI/CD", "Jenkins", "GitHub Actions",
+    "Amazon Web Services", "Google Cloud Platform", "Microsoft Azure",
+    "PostgreSQL", "MySQL", "MongoDB", "Redis", "Elasticsearch", "Kafka", "RabbitMQ",
+    "Spark", "Hadoop", "Airflow", "Snowflake", "dbt", "ETL",
+    "Machine Learning", "Deep Learning", "Natural Language Processing", "Computer Vision",
+    "Large Language Models", "TensorFlow", "PyTorch", "Scikit-learn", "Pandas", "NumPy",
+    "Tableau", "Power BI", "Excel", "Figma", "Jira", "Agile", "Scrum",
+)
+
+SOFT_SKILL_LEXICON = (
+    "Communication", "Teamwork", "Collaboration", "Leadership", "Problem Solving", "Critical Thinking",
+    "Time Management", "Adaptability", "Attention to Detail", "Mentoring", "Stakeholder Management",
+    "Ownership", "Creativity", "Analytical Thinking", "Presentation",
+)
+
+MAX_RESPONSIBILITIES = 8
+
+draft_stats = {"drafts": 0, "fallbacks": 0}
+
+_RESPONSIBILITY_HEADING_RE = re.compile(
+    r"\s*(?:key\s+)?(?:responsibilities|duties|what you(?:'|’)?ll do|what you will do|your role|the role|"
+    r"role overview|day to day|in this role)[^\n]{0,20}:?\s*",
+    re.IGNORECASE,
+)
+_OTHER_HEADING_RE = re.compile(
+    r"\s*(?:requirements|qualifications|what you(?:'|’)?ll need|what we(?:'|’)?re looking for|"
+    r"skills|about (?:us|you|the company)|benefits|perks|nice to have|preferred)[^\n]{0,20}:?\s*",
+    re.IGNORECASE,
+)
+_BULLET_RE = re.compile(r"\s*(?:[-*•●▪◦‣–·]|\d{1,2}[.)])\s+(.+)")
+_LABEL_RE = re.compile(r"\s*(job title|title|position|role|company|location)\s*:\s*(.+)", re.IGNORECASE)
+_SEEKING_RE = re.compile(
+    r"(?:hiring|looking for|seeking|searching for)\s+(?:an?\s+|the\s+)?((?:[A-Z][\w+#./-]*\s?){1,5})"
+)
+_COMPANY_RE = re.compile(
+    r"\b(?:[Jj]oin|at)[ \t]+(?P<after>[A-Z][\w&.-]*(?:[ \t][A-Z][\w&.-]*){0,2})"
+    r"|(?P<before>[A-Z][\w&.-]*(?:[ \t][A-Z][\w&.-]*){0,2})[ \t]+is[ \t]+(?:hiring|looking|seeking)"
+)
+_YEARS_RE = re.compile(r"(\d{1,2})\s*\+?\s*(?:-\s*\d{1,2}\s*)?years?", re.IGNORECASE)
+_EDUCATION_RE = re.compile(r"[^.\n]*\b(?:bachelor|master|ph\.?d|degree|b\.?s\.?c?|m\.?s\.?c?)\b[^.\n]*", re.IGNORECASE)
+_LOCATION_RE = re.compile(r"\b(remote|hybrid|on-?site)\b", re.IGNORECASE)
+_EMPLOYMENT_RE = re.compile(r"\b(full[- ]time|part[- ]time|contract|internship|temporary|freelance)\b", re.IGNORECASE)
+
+
+def _experience_level(role_title: str, text: str) -> str:
+    # The title is the strongest signal; the body often mentions other levels ("mentor juniors")
+    title = role_title.lower()
+    if re.search(r"\b(senior|sr\.?|lead|principal|staff)\b", title):
+        return "Senior"
+    if re.search(r"\b(junior|jr\.?|intern|graduate|entry[- ]level)\b", title):
+        return "Entry-level"
+    years = [int(match.group(1)) for match in _YEARS_RE.finditer(text)]
+    if years:
+        required = min(years)
+        if required < 2:
+            return "Entry-level"
+        return "Mid-level" if required < 5 else "Senior"
+    if re.search(r"\b(entry[- ]level|internship|new grad|graduate)\b", text, re.IGNORECASE):
+        return "Entry-level"
+    return "Not specified"
+
+
+def _responsibilities(lines: List[str]) -> List[str]:
+    responsibilities = []
+    in_section = False
+    for line in lines:
+        if _RESPONSIBILITY_HEADING_RE.fullmatch(line):
+            in_section = True
+            continue
+        if _OTHER_HEADING_RE.fullmatch(line):
+            in_section = False
+            continue
+        bullet = _BULLET_RE.fullmatch(line)
+        if in_section and bullet:
+            responsibilities.append(bullet.group(1).strip())
+        if len(responsibilities) >= MAX_RESPONSIBILITIES:
+            break
+    return responsibilities
+
+
+def _labelled_fields(lines: List[str]) -> Dict[str, str]:
+    """Collect "Title: ...", "Company: ...", "Location: ..." style lines."""
+    fields = {}
+    for line in lines:
+        label = _LABEL_RE.fullmatch(line)
+        if label:
+            key = label.group(1).lower()
+            key = key if key in ("company", "location") else "role"
+            fields.setdefault(key, label.group(2).strip())
+    return fields
+
+
+def _role_title(lines: List[str], text: str, fields: Dict[str, str]) -> str:
+    if "role" in fields:
+        return fields["role"]
+    seeking = _SEEKING_RE.search(text)
+    if seeking:
+        return seeking.group(1).strip()
+    if lines and len(lines[0].split()) <= 8:
+        return lines[0].strip()
+    return "Not specified"
+
+
+def draft_job_analysis(job_description: str) -> Dict:
+    """Build a JobDescriptionAnalysis from the posting with lexicon and heading heuristics."""
+    draft_stats["drafts"] += 1
+    lines = [line for line in job_description.splitlines() if line.strip()]
+
+    fields = _labelled_fields(lines)
+    hard_matches = get_skill_matcher(HARD_SKILL_LEXICON).matched_skills(job_description)
+    soft_matches = get_skill_matcher(SOFT_SKILL_LEXICON).matched_skills(job_description)
+    company = _COMPANY_RE.search(job_description)
+    education = _EDUCATION_RE.search(job_description)
+    location = _LOCATION_RE.search(job_description)
+    employment = _EMPLOYMENT_RE.search(job_description)
+
+    role_title = _role_title(lines, job_description, fields)
+
+    analysis = JobDescriptionAnalysis(
+        role_title=role_title,
+        company_name=fields.get("company") or (company.group("after") or company.group("before") if company else None),
+        hard_skills=[skill for skill in HARD_SKILL_LEXICON if skill in hard_matches],
+        soft_skills=[skill for skill in SOFT_SKILL_LEXICON if skill in soft_matches],
+        responsibilities=_responsibilities(lines),
+        experience_level=_experience_level(role_title, job_description),
+        required_education=education.group(0).strip(" -*•\t") if education else None,
+        location=fields.get("location") or (location.group(1).title() if location else None),
+        employment_type=employment.group(1).replace(" ", "-").title() if employment else None,
+    )
+    return analysis.model_dump()
@@ -1,20 +1,36 @@
 import os
 import sys
-from typing import Annotated, Dict, Optional
+from typing import Annotated, Callable, Dict, Optional
 from typing_extensions import TypedDict
 
-# Add the backend directory to Python path
-backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-if backend_path not in sys.path:
-    sys.path.insert(0, backend_path)
+# Loaded as a standalone file by LangGraph Studio: make the app package importable
+if not __package__:
+    backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    if backend_path not in sys.path:
+        sys.path.insert(0, backend_path)
 
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
+from langgraph.types import StateSnapshot
 
-from app.workflow.agents.resume_tailor import ResumeTailorAgent
+from app.workflow.agents.resume_tailor import ResumeTailorAgent, analyze_skills, use_section_mode
 from app.workflow.agents.cover_letter_generator import CoverLetterGeneratorAgent
 from app.workflow.agents.jd_analyzer import JDAnalyzerAgent
 from app.workflow.config import handle_callback
+from app.workflow.resume_parser import parse_resume
+from app.workflow.draft_analysis import draft_job_analysis, draft_stats
+from app.workflow.scheduler import llm_scheduler
+from app.utils import hash_job_description
+from app.cache import jd_analysis_cache
+from app.near_duplicate import compute_signature, jd_near_duplicates
+from app.metrics import timed
+from app.workflow.checkpoint import checkpointer
+from app.workflow.registry import GRAPH_MODES, get_graph
+
+def keep_first_error(current: Optional[str], new: Optional[str]) -> Optional[str]:
+    """Reducer that lets parallel branches report errors without conflicting writes."""
+    return current or new
 
 # Define the state for the graph
 class State(TypedDict):
@@ -24,26 +40,80 @@ class State(TypedDict):
     jd_analysis: Optional[Dict]
     tailored_resume: Optional[Dict]
     cover_letter: Optional[Dict]
-    error: Optional[str]
-    callback: Optional[callable]
+    error: Annotated[Optional[str], keep_first_error]
+    degraded: Optional[bool]
+    jd_similarity: Optional[float]
+
+def get_callback(config: Optional[RunnableConfig]) -> Optional[Callable]:
+    """Return the progress callback passed in the run config, if any.
+
+    The callback travels in config rather than state so that checkpointed
+    state stays serializable.
+    """
+    return get_option(config, "callback")
+
+def get_option(config: Optional[RunnableConfig], name: str):
+    """Return a per-run option from the run config, such as a regeneration's temperature or tone."""
+    return ((config or {}).get("configurable") or {}).get(name)
 
 # Node functions
-async def jd_analyzer_node(state: Dict) -> Dict:
+@timed("node", "jd_analyzer")
+async def jd_analyzer_node(state: Dict, config: RunnableConfig) -> Dict:
     """Node function for analyzing job descriptions."""
-    await handle_callback(state.get("callback"), {"status": "processing", "agent": "jd_analyzer", "message": "Analyzing job description"})
+    await handle_callback(get_callback(config), {"status": "processing", "agent": "jd_analyzer", "message": "Analyzing job description"})
     
     job_description = state.get("job_description", "").strip()
     
     if not job_description:
         return {"jd_analysis": {"error": "No job description provided"}}
     
+    cache_key = hash_job_description(job_description)
+    cached_analysis = await jd_analysis_cache.get(cache_key)
+    if cached_analysis is not None:
+        await handle_callback(get_callback(config), {"status": "processing", "agent": "jd_analyzer", "message": "Using cached job analysis"})
+        return {"jd_analysis": cached_analysis}
+    
+    # Reposted jobs differ by a date or some boilerplate; reuse the analysis of a near-duplicate
+    signature = compute_signature(job_description)
+    near_duplicate = await jd_near_duplicates.find(signature)
+    if near_duplicate is not None:
+        similar_analysis = await jd_analysis_cache.get(near_duplicate.key)
+        if similar_analysis is not None:
+            await handle_callback(get_callback(config), {"status": "processing", "agent": "jd_analyzer", "message": f"Using analysis of a near-duplicate job description (similarity {near_duplicate.similarity:.2f})"})
+            return {"jd_analysis": similar_analysis, "jd_similarity": near_duplicate.similarity}
+    
+    # Rule-based analysis in milliseconds; clients show it until the LLM result replaces it
+    draft_analysis = draft_job_analysis(job_description)
+    if get_callback(config) is not None:
+        skill_analysis = analyze_skills(
+            state.get("original_resume") or "",
+            draft_analysis["hard_skills"] + draft_analysis["soft_skills"]
+        )
+        await handle_callback(get_callback(config), {"status": "draft", "agent": "jd_analyzer", "data": {"job_analysis": draft_analysis, "skill_analysis": skill_analysis}})
+    
+    if llm_scheduler.saturated():
+        return await use_draft_analysis(draft_analysis, config)
+    
     agent = JDAnalyzerAgent()
-    jd_analysis = await agent.analyze_job_description_async(job_description)
+    jd_analysis = await agent.analyze_job_description_async(job_description, get_callback(config))
+    if jd_analysis.get("error") and llm_scheduler.saturated():
+        # Rate limited even after retries: shed load rather than fail the run
+        return await use_draft_analysis(draft_analysis, config)
+    if not jd_analysis.get("error"):
+        await jd_analysis_cache.set(cache_key, jd_analysis)
+        await jd_near_duplicates.add(cache_key, signature)
     return {"jd_analysis": jd_analysis}
 
-async def resume_tailor_node(state: Dict) -> Dict:
+async def use_draft_analysis(draft_analysis: Dict, config: RunnableConfig) -> Dict:
+    """Fall back to the rule-based analysis while the LLM is saturated; never cached."""
+    draft_stats["fallbacks"] += 1
+    await handle_callback(get_callback(config), {"status": "processing", "agent": "jd_analyzer", "message": "Model is busy, using draft job analysis"})
+    return {"jd_analysis": draft_analysis, "degraded": True}
+
+@timed("node", "resume_tailor")
+async def resume_tailor_node(state: Dict, config: RunnableConfig) -> Dict:
     """Node for tailoring resume based on job analysis."""
-    await handle_callback(state.get("callback"), {"status": "processing", "agent": "resume_tailor", "message": "Tailoring resume"})
+    await handle_callback(get_callback(config), {"status": "processing", "agent": "resume_tailor", "message": "Tailoring resume"})
     
     try:
         jd_analysis = state.get("jd_analysis")
@@ -55,16 +125,21 @@ async def resume_tailor_node(state: Dict) -> Dict:
         if not original_resume:
             return {"error": "Original resume required for tailoring"}
         
-        agent = ResumeTailorAgent()
-        tailored_resume = await agent.tailor_resume_async(original_resume, jd_analysis)
+        agent = ResumeTailorAgent(get_option(config, "temperature"))
+        if use_section_mode(original_resume, get_option(config, "tailor_mode")):
+            # Map-reduce: wall-clock time follows the longest section, not the whole resume
+            tailored_resume = await agent.tailor_sections_async(original_resume, jd_analysis, get_callback(config))
+        else:
+            tailored_resume = await agent.tailor_resume_async(original_resume, jd_analysis, get_callback(config))
         return {"tailored_resume": tailored_resume}
         
     except Exception as e:
         return {"error": f"Resume tailoring failed: {str(e)}"}
 
-async def cover_letter_node(state: Dict) -> Dict:
+@timed("node", "cover_letter_generator")
+async def cover_letter_node(state: Dict, config: RunnableConfig) -> Dict:
     """Node for generating cover letter based on tailored resume and job analysis."""
-    await handle_callback(state.get("callback"), {"status": "processing", "agent": "cover_letter_generator", "message": "Generating cover letter"})
+    await handle_callback(get_callback(config), {"status": "processing", "agent": "cover_letter_generator", "message": "Generating cover letter"})
     
     try:
         tailored_resume = state.get("tailored_resume")
@@ -76,23 +151,132 @@ async def cover_letter_node(state: Dict) -> Dict:
         if not jd_analysis or jd_analysis.get("error"):
             return {"error": "Job analysis required for cover letter generation"}
         
-        agent = CoverLetterGeneratorAgent()
-        cover_letter = await agent.generate_cover_letter_async(tailored_resume, jd_analysis)
+        original_resume = state.get("original_resume")
+        candidate_name = parse_resume(original_resume).name if original_resume else None
+        
+        agent = CoverLetterGeneratorAgent(get_option(config, "temperature"))
+        cover_letter = await agent.generate_cover_letter_async(tailored_resume, jd_analysis, get_callback(config), candidate_name, get_option(config, "tone"))
+        return {"cover_letter": cover_letter}
+        
+    except Exception as e:
+        return {"error": f"Cover letter generation failed: {str(e)}"}
+
+@timed("node", "cover_letter_generator")
+async def draft_cover_letter_node(state: Dict, config: RunnableConfig) -> Dict:
+    """Node for generating a cover letter from the original resume, in parallel with tailoring."""
+    await handle_callback(get_callback(config), {"status": "processing", "agent": "cover_letter_generator", "message": "Generating cover letter"})
+    
+    try:
+        jd_analysis = state.get("jd_analysis")
+        original_resume = state.get("original_resume")
+        
+        if not jd_analysis or jd_analysis.get("error"):
+            return {"error": "Job analysis required for cover letter generation"}
+        
+        if not original_resume:
+            return {"error": "Original resume required for cover letter generation"}
+        
+        # Cached by resume hash, so this reuses the parse the other nodes made
+        parsed = parse_resume(original_resume)
+        sections = parsed.to_sections()
+        skill_analysis = analyze_skills(
+            original_resume,
+            jd_analysis.get("hard_skills", []) + jd_analysis.get("soft_skills", [])
+        )
+        
+        # Stand-in for the tailored resume built from the untouched original
+        draft_resume = {
+            "sections": [s.model_dump() for s in sections] or [{"title": "RESUME", "content": original_resume}],
+            "highlighted_skills": skill_analysis["matched_skills"],
+            "match_score": skill_analysis["match_percentage"],
+            "tailoring_notes": []
+        }
+        
+        agent = CoverLetterGeneratorAgent(get_option(config, "temperature"))
+        cover_letter = await agent.generate_cover_letter_async(draft_resume, jd_analysis, get_callback(config), parsed.name, get_option(config, "tone"))
         return {"cover_letter": cover_letter}
         
     except Exception as e:
         return {"error": f"Cover letter generation failed: {str(e)}"}
 
-def create_graph():
-    """Create and compile the multiagent workflow graph."""
+@timed("node", "join")
+async def join_node(state: Dict) -> Dict:
+    """Reconcile the cover letter's highlighted skills with the tailored resume."""
+    if state.get("error"):
+        return {}
+    
+    tailored_resume = state.get("tailored_resume") or {}
+    cover_letter = state.get("cover_letter") or {}
+    highlighted_skills = tailored_resume.get("highlighted_skills", [])
+    
+    # The tailored resume is authoritative: keep only skills it also highlights
+    resume_skills = {skill.lower(): skill for skill in highlighted_skills}
+    reconciled = []
+    for skill in cover_letter.get("key_skills_highlighted", []):
+        match = resume_skills.get(skill.lower())
+        if match and match not in reconciled:
+            reconciled.append(match)
+    
+    return {"cover_letter": {**cover_letter, "key_skills_highlighted": reconciled or highlighted_skills}}
+
+def create_graph(mode: str = "sequential", checkpointer=None):
+    """
+    Create and compile the multiagent workflow graph.
+    
+    Args:
+        mode: "sequential" runs tailoring before the cover letter; "parallel"
+            generates the cover letter from the original resume concurrently
+            with tailoring and reconciles the two in a join step
+        checkpointer: Optional saver that persists state after every node
+    """
+    if mode not in GRAPH_MODES:
+        raise ValueError(f"Unknown graph mode: {mode}")
+    
     graph_builder = StateGraph(State)
     graph_builder.add_node("jd_analyzer", jd_analyzer_node)
     graph_builder.add_node("resume_tailor", resume_tailor_node)
-    graph_builder.add_node("cover_letter_generator", cover_letter_node)
     graph_builder.add_edge(START, "jd_analyzer")
     graph_builder.add_edge("jd_analyzer", "resume_tailor")
-    graph_builder.add_edge("resume_tailor", "cover_letter_generator")
-    graph_builder.add_edge("cover_letter_generator", END)
-    return graph_builder.compile()
+    
+    if mode == "parallel":
+        graph_builder.add_node("cover_letter_generator", draft_cover_letter_node)
+        graph_builder.add_node("join", join_node)
+        graph_builder.add_edge("jd_analyzer", "cover_letter_generator")
+        graph_builder.add_edge(["resume_tailor", "cover_letter_generator"], "join")
+        graph_builder.add_edge("join", END)
+    else:
+        graph_builder.add_node("cover_letter_generator", cover_letter_node)
+        graph_builder.add_edge("resume_tailor", "cover_letter_generator")
+        graph_builder.add_edge("cover_letter_generator", END)
+    
+    return graph_builder.compile(checkpointer=checkpointer)
+
+def __getattr__(name: str):
+    """Compile resume_agent / resume_agent_parallel on first access (used by LangGraph Studio)."""
+    if name == "resume_agent":
+        return get_graph("sequential")
+    if name == "resume_agent_parallel":
+        return get_graph("parallel")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def has_failed(values: Dict) -> bool:
+    """Return True if a state snapshot records a failed node."""
+    jd_analysis = values.get("jd_analysis") or {}
+    return bool(values.get("error") or jd_analysis.get("error"))
 
-resume_agent = create_graph()
+async def find_resume_checkpoint(run_id: str) -> Optional[StateSnapshot]:
+    """
+    Find the checkpoint a failed or interrupted run should continue from.
+    
+    Returns the most recent snapshot that still has nodes to run and records
+    no failure, or None if the run is unknown or already completed.
+    """
+    latest = await checkpointer.aget_tuple({"configurable": {"thread_id": run_id}})
+    if latest is None:
+        return None
+    
+    graph = get_graph(latest.metadata.get("graph_mode", "sequential"))
+    async for snapshot in graph.aget_state_history({"configurable": {"thread_id": run_id}}):
+        if snapshot.next and not has_failed(snapshot.values):
+            return snapshot
+    return None
@@ -67,6 +67,13 @@ class TailoredResume(BaseModel):
     tailoring_notes: List[str] = Field(default_factory=list, description="Notes about changes made during tailoring")
 
 
+class TailoredSection(BaseModel):
+    """Pydantic schema for one section tailored on its own in section-by-section tailoring."""
+    title: str = Field(description="Section title, unchanged from the original")
+    content: str = Field(description="Tailored section content")
+    notes: List[str] = Field(default_factory=list, description="Notes about changes made to this section")
+
+
 # Pydantic schema for cover letter output
 class CoverLetter(BaseModel):
     """Pydantic schema for generated cover letter."""
@@ -0,0 +1,146 @@
+"""
+Field-level validation and repair of structured agent output.
+
+A completion is checked field by field against the agent's output model
+instead of all at once. Fields that are valid are kept. Fields that are
+missing, fail their type, or were cut off by a truncated completion are
+re-requested with a short follow-up prompt asking for only those fields,
+and merged back in. The whole output is requested again only when too
+little of it is usable or the targeted repair does not validate.
+"""
+
+import json
+import os
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.utils.json import parse_json_markdown
+from pydantic import BaseModel, create_model
+
+from ..metrics import output_repairs_total, stage_timer
+from .prompts import get_field_repair_prompt
+from .streaming import field_error, stream_llm_response
+
+# Above this share of broken required fields the output is requested again in full
+OUTPUT_REPAIR_MAX_FIELD_RATIO = float(os.getenv("OUTPUT_REPAIR_MAX_FIELD_RATIO", "0.5"))
+
+output_repair_stats = {"validated": 0, "partial_repairs": 0, "full_repairs": 0, "failed": 0}
+
+
+def check_fields(model: Type[BaseModel], content: str) -> Tuple[Dict, Dict[str, str]]:
+    """
+    Split a completion into the fields that are valid for model and the problems with the rest.
+
+    Returns:
+        Valid field values, and a problem description for each broken field
+    """
+    try:
+        parsed = parse_json_markdown(content, parser=json.loads)
+        complete = True
+    except Exception:
+        # Truncated or malformed: salvage what the partial parser can read
+        try:
+            parsed = parse_json_markdown(content)
+        except Exception:
+            parsed = None
+        complete = False
+    if not isinstance(parsed, dict):
+        return {}, {field: "missing" for field in model.model_fields}
+
+    # Without the closing brace the last key may be cut off mid-value
+    open_field = list(parsed)[-1] if parsed and not complete else None
+    valid, errors = {}, {}
+    for field, info in model.model_fields.items():
+        if field == open_field:
+            errors[field] = "cut off before it was complete"
+        elif field in parsed:
+            error = field_error(model, field, parsed[field])
+            if error:
+                errors[field] = error
+            else:
+                valid[field] = parsed[field]
+        elif info.is_required() or not complete:
+            # A truncated completion may have dropped optional fields too
+            errors[field] = "missing"
+    return valid, errors
+
+
+@lru_cache(maxsize=None)
+def _subset_model(model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    return create_model(
+        f"{model.__name__}Repair",
+        **{field: (model.model_fields[field].annotation, model.model_fields[field]) for field in fields}
+    )
+
+
+def _record(agent: str, kind: str) -> None:
+    output_repair_stats[kind] += 1
+    if kind != "validated":
+        output_repairs_total.inc(agent=agent, kind=kind.replace("_repairs", ""))
+
+
+async def _repair_fields(llm, messages: List, content: str, model: Type[BaseModel], errors: Dict[str, str], agent: str) -> Dict:
+    repair_model = _subset_model(model, tuple(errors))
+    schema = json.dumps(repair_model.model_json_schema(), indent=2)
+    problems = "\n".join(f"- {field}: {error}" for field, error in errors.items())
+    follow_up = list(messages) + [AIMessage(content=content), HumanMessage(content=get_field_repair_prompt(problems, schema))]
+    repaired = await stream_llm_response(llm, follow_up, None, agent)
+    valid, remaining = check_fields(repair_model, repaired)
+    if remaining:
+        raise ValueError(f"repair left invalid fields: {', '.join(remaining)}")
+    return valid
+
+
+async def validate_output(
+    llm,
+    messages: List,
+    content: str,
+    model: Type[BaseModel],
+    agent: str,
+    prepare: Optional[Callable[[Dict], Dict]] = None
+) -> BaseModel:
+    """
+    Validate a completion against model, repairing only the fields that are broken.
+
+    Args:
+        llm: Chat model that produced content, used for repair requests
+        messages: Prompt messages content was generated from
+        content: Full text of the completion
+        model: Output model to validate against
+        agent: Agent name for metrics and logs
+        prepare: Optional function filling derived fields before final validation
+
+    Returns:
+        Validated model instance
+
+    Raises:
+        ValueError: If the output is still invalid after a full re-request
+    """
+    prepare = prepare or (lambda data: data)
+    with stage_timer("output_parsing", agent):
+        valid, errors = check_fields(model, content)
+    if not errors:
+        _record(agent, "validated")
+        return model(**prepare(valid))
+
+    print(f"Output validation [{agent}]: {len(errors)}/{len(model.model_fields)} fields invalid ({', '.join(errors)})")
+    required = [field for field, info in model.model_fields.items() if info.is_required()]
+    broken_required = [field for field in required if field in errors]
+    if valid and len(broken_required) <= OUTPUT_REPAIR_MAX_FIELD_RATIO * len(required):
+        try:
+            valid.update(await _repair_fields(llm, messages, content, model, errors, agent))
+            result = model(**prepare(valid))
+            _record(agent, "partial_repairs")
+            return result
+        except Exception as e:
+            print(f"Field repair failed [{agent}], requesting the full output again: {str(e)}")
+
+    content = await stream_llm_response(llm, messages, None, agent)
+    with stage_timer("output_parsing", agent):
+        valid, errors = check_fields(model, content)
+    if errors:
+        _record(agent, "failed")
+        raise ValueError(f"Output validation failed for fields: {', '.join(errors)}")
+    _record(agent, "full_repairs")
+    return model(**prepare(valid))
@@ -0,0 +1,172 @@
+"""
+Prompt assembly with token accounting.
+
+Agents describe the context they send as named segments with a priority.
+The assembler serializes structured segments compactly, replaces segments
+that repeat a higher-priority one with a short reference to it, counts tokens per
+segment and trims the lowest-priority segments first until the prompt fits
+the agent's input budget.
+"""
+
+import json
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from langchain_core.prompts import ChatPromptTemplate
+
+TRUNCATION_MARKER = " ...[truncated]"
+
+# Approximate characters per token for Gemini-family tokenizers
+CHARS_PER_TOKEN = 4
+
+PROMPT_BUDGETS = {
+    "jd_analyzer": int(os.getenv("PROMPT_BUDGET_JD_ANALYZER", "8000")),
+    "resume_tailor": int(os.getenv("PROMPT_BUDGET_RESUME_TAILOR", "12000")),
+    "cover_letter_generator": int(os.getenv("PROMPT_BUDGET_COVER_LETTER", "10000"))
+}
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count of text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def compact_json(data: Any) -> str:
+    """Serialize data as JSON without indentation or padding."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def template_tokens(prompt: "ChatPromptTemplate") -> int:
+    """Tokens used by a prompt template's fixed text, excluding its variables."""
+    messages = prompt.format_messages(**{name: "" for name in prompt.input_variables})
+    return sum(count_tokens(message.content) for message in messages)
+
+
+class PromptSegment:
+    """A named piece of prompt context; higher priority survives trimming longer."""
+
+    def __init__(self, name: str, content: Any, priority: int = 0, required: bool = False):
+        self.name = name
+        self.text = content if isinstance(content, str) else compact_json(content)
+        self.priority = priority
+        self.required = required
+        self.original_tokens = count_tokens(self.text)
+        self.tokens = self.original_tokens
+        self.duplicate_of: Optional[str] = None
+        self.truncated = False
+
+    def trim(self, tokens: int) -> None:
+        """Shrink the segment to at most the given number of tokens."""
+        if tokens >= self.tokens:
+            return
+        if tokens <= count_tokens(TRUNCATION_MARKER):
+            self.text = ""
+        else:
+            keep_chars = (tokens - count_tokens(TRUNCATION_MARKER)) * CHARS_PER_TOKEN
+            self.text = self.text[:keep_chars] + TRUNCATION_MARKER
+        self.tokens = count_tokens(self.text)
+        self.truncated = True
+
+
+class PromptAssembler:
+    """Collect segments for one agent call and fit them into its token budget."""
+
+    def __init__(self, agent: str, fixed_tokens: int = 0, budget: Optional[int] = None):
+        self.agent = agent
+        self.fixed_tokens = fixed_tokens
+        self.budget = budget if budget is not None else PROMPT_BUDGETS.get(agent)
+        self.segments: List[PromptSegment] = []
+
+    def add(self, name: str, content: Any, priority: int = 0, required: bool = False) -> "PromptAssembler":
+        self.segments.append(PromptSegment(name, content, priority, required))
+        return self
+
+    def _deduplicate(self) -> None:
+        seen: Dict[str, str] = {}
+        for segment in sorted(self.segments, key=lambda s: -s.priority):
+            key = " ".join(segment.text.split())
+            if not key:
+                continue
+            if key in seen:
+                # Point at the earlier segment rather than blanking the value, so
+                # the labelled field still tells the model what it holds
+                reference = f"(same as {seen[key].replace('_', ' ').upper()})"
+                if count_tokens(reference) < segment.tokens:
+                    segment.duplicate_of = seen[key]
+                    segment.text = reference
+                    segment.tokens = count_tokens(reference)
+            else:
+                seen[key] = segment.name
+
+    def _fit_budget(self) -> None:
+        if self.budget is None:
+            return
+        excess = self.fixed_tokens + sum(s.tokens for s in self.segments) - self.budget
+        # Optional segments give way first, then required ones, lowest priority first
+        for required in (False, True):
+            for segment in sorted(self.segments, key=lambda s: s.priority):
+                if excess <= 0:
+                    return
+                if segment.required != required or not segment.tokens:
+                    continue
+                before = segment.tokens
+                segment.trim(max(before - excess, 0))
+                excess -= before - segment.tokens
+
+    def build(self) -> Tuple[Dict[str, str], Dict]:
+        """
+        Deduplicate and trim the segments.
+
+        Returns:
+            Template values keyed by segment name, and a report with per-segment
+            token counts
+        """
+        self._deduplicate()
+        self._fit_budget()
+
+        values = {segment.name: segment.text for segment in self.segments}
+        report = {
+            "agent": self.agent,
+            "budget": self.budget,
+            "fixed_tokens": self.fixed_tokens,
+            "total_tokens": self.fixed_tokens + sum(s.tokens for s in self.segments),
+            "segments": {
+                segment.name: {
+                    "tokens": segment.tokens,
+                    "original_tokens": segment.original_tokens,
+                    "truncated": segment.truncated,
+                    "duplicate_of": segment.duplicate_of
+                }
+                for segment in self.segments
+            }
+        }
+        prompt_stats.record(report)
+        segments = ", ".join(f"{name}={info['tokens']}" for name, info in report["segments"].items())
+        print(f"Prompt tokens [{self.agent}]: {report['total_tokens']}/{self.budget} ({segments})")
+        return values, report
+
+
+class PromptStats:
+    """Running per-agent, per-segment input token totals."""
+
+    def __init__(self):
+        self.agents: Dict[str, Dict] = {}
+
+    def record(self, report: Dict) -> None:
+        agent = self.agents.setdefault(report["agent"], {
+            "calls": 0, "total_tokens": 0, "truncated_calls": 0, "segments": {}
+        })
+        agent["calls"] += 1
+        agent["total_tokens"] += report["total_tokens"]
+        agent["last_call"] = report
+        if any(s["truncated"] for s in report["segments"].values()):
+            agent["truncated_calls"] += 1
+        for name, segment in report["segments"].items():
+            agent["segments"][name] = agent["segments"].get(name, 0) + segment["tokens"]
+
+    def stats(self) -> Dict:
+        return self.agents
+
+
+prompt_stats = PromptStats()
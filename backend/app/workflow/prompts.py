@@ -123,6 +123,35 @@ Focus on creating a resume that tells a compelling story of the candidate's fit
 
 
 
+def get_section_tailor_prompt(schema_str: str) -> str:
+    """
+    Returns the system prompt for tailoring a single resume section.
+    
+    Args:
+        schema_str: JSON schema string for the output format
+        
+    Returns:
+        Formatted system prompt
+    """
+    return f"""You are an elite resume optimization specialist. You are given ONE section of a candidate's resume, together with an analysis of the target job. Other sections are being tailored separately, so work only with the content of this section.
+
+CORE PRINCIPLES:
+• AUTHENTICITY FIRST: Never fabricate experience, skills, or achievements
+• ATS OPTIMIZATION: Naturally use the job's exact terminology where the candidate's experience supports it
+• IMPACT FOCUS: Turn passive descriptions into active, achievement-focused statements and keep every existing metric
+• RELEVANCE PRIORITY: Put the most relevant items for the target role first
+
+SECTION RULES:
+• Keep the section title exactly as given
+• Do not move content into or out of this section, and do not repeat content that belongs in other sections
+• SKILLS sections: for missing hard skills, add them only with honest qualifiers like "(learning)", "(basic)" or "(familiar)"; soft skills may be added without qualifiers
+• Record every change worth reviewing in notes, including each skill added and whether it carries a qualifier
+
+OUTPUT REQUIREMENTS:
+Return ONLY valid JSON matching this exact schema - no explanatory text:
+{schema_str}"""
+
+
 def get_cover_letter_prompt(schema_str: str) -> str:
     """
     Returns the system prompt for cover letter generation.
@@ -211,4 +240,21 @@ OUTPUT REQUIREMENTS:
 Return ONLY valid JSON matching this exact schema - no explanatory text:
 {schema_str}
 
-Create a cover letter that tells a compelling story of the candidate's perfect fit for the role while maintaining authenticity and professionalism."""
\ No newline at end of file
+Create a cover letter that tells a compelling story of the candidate's perfect fit for the role while maintaining authenticity and professionalism."""
+
+def get_field_repair_prompt(field_errors: str, schema_str: str) -> str:
+    """
+    Returns the follow-up prompt asking the model to redo only the invalid fields of its previous response.
+    
+    Args:
+        field_errors: One "- field: problem" line per invalid or missing field
+        schema_str: JSON schema string covering only those fields
+        
+    Returns:
+        Formatted repair prompt
+    """
+    return f"""Some fields of your previous JSON response are missing, cut off or do not match the schema:
+{field_errors}
+
+Keep everything else as it was. Reply with ONLY a JSON object containing these fields, corrected and complete, matching this exact schema - no explanatory text:
+{schema_str}"""
@@ -0,0 +1,59 @@
+"""
+Lazily constructed LLM clients and compiled graphs.
+
+Nothing here is built at import time: the first get_llm or get_graph call
+for a name constructs it (importing LangGraph, the agents and the Gemini
+client on the way) and every later call reuses it. warm_up() builds all of
+them up front so the API and workers pay that cost during startup instead
+of on the first request.
+"""
+
+import time
+from typing import Dict, Optional
+
+from .config import create_llm
+from .scheduler import ScheduledLLM
+
+GRAPH_MODES = ("sequential", "parallel")
+
+LLM_TEMPERATURES = {
+    "jd_analyzer": 0.1,
+    "resume_tailor": 0.3,
+    "cover_letter_generator": 0.4
+}
+
+_llms: Dict[str, ScheduledLLM] = {}
+_graphs: Dict[str, object] = {}
+
+
+def get_llm(agent: str, temperature: Optional[float] = None) -> ScheduledLLM:
+    """Return the shared LLM client for an agent (optionally at another temperature), creating it on first use."""
+    key = agent if temperature is None else f"{agent}@{temperature:g}"
+    llm = _llms.get(key)
+    if llm is None:
+        llm = _llms[key] = create_llm(temperature=LLM_TEMPERATURES[agent] if temperature is None else temperature)
+    return llm
+
+
+def get_graph(mode: str = "sequential"):
+    """Return the compiled graph for a workflow mode, compiling it on first use."""
+    if mode not in GRAPH_MODES:
+        raise ValueError(f"Unknown graph mode: {mode}")
+    graph = _graphs.get(mode)
+    if graph is None:
+        from .checkpoint import checkpointer
+        from .graph import create_graph
+        graph = _graphs[mode] = create_graph(mode, checkpointer=checkpointer)
+    return graph
+
+
+def warm_up() -> float:
+    """Build every LLM client and compile every graph mode; returns the seconds taken."""
+    start = time.perf_counter()
+    for agent in LLM_TEMPERATURES:
+        get_llm(agent)
+    for mode in GRAPH_MODES:
+        get_graph(mode)
+    elapsed = time.perf_counter() - start
+    print(f"Workflow warm-up completed in {elapsed:.2f}s")
+    return elapsed
@@ -0,0 +1,181 @@
+"""
+Single-pass structured resume parser.
+
+parse_resume walks the resume text line by line once, using precompiled
+patterns to recognize section headings (including common variants such as
+"Work Experience" or "Technical Skills"), bullet items and dates. Sections,
+bullets and dates are recorded as character offsets into the original text
+rather than copies, and parse results are cached by the hash of the text so
+every agent in a run (and every run in a batch) shares one parse.
+"""
+
+import hashlib
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from ..cache import TTLCache
+from .models import ResumeSection
+
+# Canonical section title -> heading variants (matched case-insensitively)
+SECTION_HEADINGS: Dict[str, Tuple[str, ...]] = {
+    "SUMMARY": ("summary", "professional summary", "career summary", "profile", "professional profile",
+                "objective", "career objective", "about me"),
+    "EXPERIENCE": ("experience", "work experience", "professional experience", "employment history",
+                   "work history", "relevant experience", "employment"),
+    "INTERNSHIPS": ("internships", "internship", "internship experience"),
+    "EDUCATION": ("education", "academic background", "education and training", "academics",
+                  "academic qualifications"),
+    "SKILLS": ("skills", "technical skills", "core competencies", "key skills", "skills and tools",
+               "skills & tools", "technologies", "tech stack", "tools and technologies"),
+    "PROJECTS": ("projects", "personal projects", "key projects", "academic projects", "selected projects"),
+    "CERTIFICATIONS": ("certifications", "certificates", "licenses and certifications",
+                       "licenses & certifications", "courses and certifications"),
+    "EXTRACURRICULAR": ("extracurricular", "extracurriculars", "extracurricular activities", "activities",
+                        "leadership", "leadership and activities"),
+    "AWARDS": ("awards", "honors", "honors and awards", "awards and honors", "achievements"),
+    "PUBLICATIONS": ("publications", "research"),
+    "VOLUNTEER": ("volunteer experience", "volunteering", "volunteer work"),
+    "LANGUAGES": ("languages",),
+}
+
+_HEADING_TITLES = {variant: title for title, variants in SECTION_HEADINGS.items() for variant in variants}
+
+# Single words that are as likely to be an item in a one-per-line list ("Leadership"
+# under SKILLS); they only start a section when written in capitals or followed by a colon
+AMBIGUOUS_HEADINGS = frozenset((
+    "activities", "leadership", "research", "languages", "technologies", "achievements",
+    "honors", "profile", "objective", "academics", "employment", "volunteering",
+))
+
+# One alternation over every variant; longest first so "work experience" wins over "experience"
+_HEADING_RE = re.compile(
+    r"[ \t]*(" + "|".join(re.escape(v) for v in sorted(_HEADING_TITLES, key=len, reverse=True)) + r")[ \t]*:?[ \t\r]*",
+    re.IGNORECASE,
+)
+_BULLET_RE = re.compile(r"[ \t]*(?:[-*•●▪◦‣–·]|\d{1,2}[.)])[ \t]+(?=\S)")
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE_RE = re.compile(
+    rf"\b(?:{_MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|(?:19|20)\d{{2}})"
+    rf"(?:\s*(?:-|–|—|to)\s*(?:{_MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|(?:19|20)\d{{2}}|present|current|now))?\b",
+    re.IGNORECASE,
+)
+_NAME_RE = re.compile(r"[ \t]*([A-Z][A-Za-z.'\-]*(?:[ \t]+[A-Z][A-Za-z.'\-]*){1,3})[ \t\r]*")
+_LINE_RE = re.compile(r"[^\n]*")
+
+RESUME_PARSE_CACHE_MAX_ENTRIES = int(os.getenv("RESUME_PARSE_CACHE_MAX_ENTRIES", "256"))
+RESUME_PARSE_CACHE_TTL_SECONDS = float(os.getenv("RESUME_PARSE_CACHE_TTL_SECONDS", "3600"))
+
+
+class Span(NamedTuple):
+    start: int
+    end: int
+
+
+class SectionSpan(NamedTuple):
+    title: str
+    heading: Span
+    content: Span
+    bullets: Tuple[Span, ...]
+
+
+class ParsedResume(NamedTuple):
+    """Offsets into text for the sections, bullets and dates of one resume."""
+
+    text: str
+    name: Optional[str]
+    sections: Tuple[SectionSpan, ...]
+    dates: Tuple[Span, ...]
+
+    def slice(self, span: Span) -> str:
+        return self.text[span.start:span.end]
+
+    def section_content(self, section: SectionSpan) -> str:
+        """Section body with blank lines dropped and each line stripped."""
+        lines = (line.strip() for line in self.slice(section.content).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+    def preamble(self) -> str:
+        """Lines above the first section heading (name and contact details), blank lines dropped."""
+        end = self.text.rfind("\n", 0, self.sections[0].heading.start) + 1 if self.sections else len(self.text)
+        lines = (line.strip() for line in self.text[:end].split("\n"))
+        return "\n".join(line for line in lines if line)
+
+    def bullet_items(self, section: SectionSpan) -> List[str]:
+        return [self.slice(bullet).strip() for bullet in section.bullets]
+
+    def date_strings(self) -> List[str]:
+        return [self.slice(span) for span in self.dates]
+
+    def to_sections(self) -> List[ResumeSection]:
+        """Materialize non-empty sections as ResumeSection models."""
+        sections = []
+        for section in self.sections:
+            content = self.section_content(section)
+            if content:
+                sections.append(ResumeSection(title=self.slice(section.heading).strip(), content=content))
+        return sections
+
+
+def _parse(text: str) -> ParsedResume:
+    name = None
+    sections: List[SectionSpan] = []
+    dates: List[Span] = []
+    current: Optional[Tuple[str, Span, int]] = None
+    bullets: List[Span] = []
+    last_end = 0
+    seen_content = False
+
+    def close_section(end: int) -> None:
+        if current is not None:
+            title, heading, start = current
+            sections.append(SectionSpan(title, heading, Span(start, end), tuple(bullets)))
+
+    for line in _LINE_RE.finditer(text):
+        start, end = line.span()
+        if start == end:
+            continue
+
+        heading = _HEADING_RE.fullmatch(text, start, end)
+        if heading and heading.group(1).lower() in AMBIGUOUS_HEADINGS:
+            if not (heading.group(1).isupper() or ":" in text[heading.end(1):end]):
+                heading = None
+        if heading:
+            close_section(last_end)
+            current = (_HEADING_TITLES[heading.group(1).lower()], Span(*heading.span(1)), end)
+            bullets = []
+            last_end = end
+            continue
+
+        if not text[start:end].strip():
+            continue
+        last_end = end
+
+        if current is None:
+            # Resumes open with the candidate's name above the contact details
+            if not seen_content:
+                name_match = _NAME_RE.fullmatch(text, start, end)
+                name = name_match.group(1) if name_match else None
+        else:
+            bullet = _BULLET_RE.match(text, start, end)
+            if bullet:
+                bullets.append(Span(bullet.end(), end))
+
+        seen_content = True
+        dates.extend(Span(*match.span()) for match in _DATE_RE.finditer(text, start, end))
+
+    close_section(last_end)
+    return ParsedResume(text, name, tuple(sections), tuple(dates))
+
+
+_parse_cache = TTLCache(maxsize=RESUME_PARSE_CACHE_MAX_ENTRIES, ttl=RESUME_PARSE_CACHE_TTL_SECONDS)
+
+
+def parse_resume(text: str) -> ParsedResume:
+    """Parse resume text, reusing the cached result for identical text."""
+    key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    parsed = _parse_cache.get(key)
+    if parsed is None:
+        parsed = _parse(text)
+        _parse_cache.set(key, parsed)
+    return parsed
@@ -0,0 +1,247 @@
+"""
+Process-wide scheduling for LLM calls.
+
+Every model created through create_llm is wrapped in a ScheduledLLM that
+shares one LLMScheduler. The scheduler admits calls in FIFO order against
+requests-per-minute and tokens-per-minute budgets, pauses all callers after
+the provider reports a rate limit, and retries 429 and 5xx failures with
+jittered exponential backoff.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+LLM_RPM = int(os.getenv("LLM_RPM", "60"))
+LLM_TPM = int(os.getenv("LLM_TPM", "1000000"))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "4"))
+LLM_COMPLETION_TOKEN_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKEN_ESTIMATE", "1000"))
+LLM_RATE_LIMIT_COOLDOWN_SECONDS = float(os.getenv("LLM_RATE_LIMIT_COOLDOWN_SECONDS", "5"))
+LLM_SATURATION_QUEUE_DEPTH = int(os.getenv("LLM_SATURATION_QUEUE_DEPTH", "16"))
+
+WINDOW_SECONDS = 60.0
+
+
+class RateLimitError(Exception):
+    """Raised by models (or stubs) when the provider rejects a call with HTTP 429."""
+
+    code = 429
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    for attr in ("code", "status_code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """
+    Return True only for errors the provider marked as HTTP 429.
+
+    Google's ResourceExhausted carries code 429; wrapped errors are checked
+    through their cause. Message text is never inspected, since token
+    counts or ids in an unrelated error can contain "429".
+    """
+    while exc is not None:
+        if _status_code(exc) == 429:
+            return True
+        exc = exc.__cause__
+    return False
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """Return True for rate limits and server-side (5xx) failures."""
+    if is_rate_limit_error(exc):
+        return True
+    status = _status_code(exc)
+    return status is not None and 500 <= status < 600
+
+
+def estimate_tokens(messages: Any) -> int:
+    """Cheap character-based token estimate for prompt messages (~4 chars per token)."""
+    if isinstance(messages, str):
+        return len(messages) // 4 + 1
+    total = 0
+    for message in messages:
+        content = getattr(message, "content", message)
+        total += len(content if isinstance(content, str) else str(content))
+    return total // 4 + 1
+
+
+class LLMScheduler:
+    """FIFO admission control for LLM calls against rolling one-minute budgets."""
+
+    def __init__(self, rpm: int = LLM_RPM, tpm: int = LLM_TPM):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._lock = asyncio.Lock()
+        # Admitted calls in the last minute as [admitted_at, tokens] pairs
+        self._window: deque = deque()
+        self._paused_until = 0.0
+        self.queue_depth = 0
+        self.admitted = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _prune(self, now: float) -> None:
+        while self._window and self._window[0][0] <= now - WINDOW_SECONDS:
+            self._window.popleft()
+
+    def _delay(self, now: float, tokens: int) -> float:
+        delay = self._paused_until - now
+
+        if len(self._window) >= self.rpm:
+            delay = max(delay, self._window[0][0] + WINDOW_SECONDS - now)
+
+        used = sum(entry[1] for entry in self._window)
+        if used + tokens > self.tpm and self._window:
+            # Wait until enough of the window has expired; a single oversized
+            # request is admitted once the window is empty
+            excess = used + tokens - self.tpm
+            for admitted_at, entry_tokens in self._window:
+                excess -= entry_tokens
+                if excess <= 0:
+                    break
+            delay = max(delay, admitted_at + WINDOW_SECONDS - now)
+
+        return delay
+
+    async def acquire(self, tokens: int) -> List:
+        """Wait for budget and return the reservation entry for settle()."""
+        self.queue_depth += 1
+        queued_at = time.monotonic()
+        try:
+            # asyncio.Lock wakes waiters in FIFO order
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    self._prune(now)
+                    delay = self._delay(now, tokens)
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+                entry = [now, tokens]
+                self._window.append(entry)
+        finally:
+            self.queue_depth -= 1
+
+        waited = time.monotonic() - queued_at
+        self.admitted += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return entry
+
+    def settle(self, entry: List, tokens: Optional[int]) -> None:
+        """Replace a reservation's estimate with the actual token usage."""
+        if tokens:
+            entry[1] = tokens
+
+    def note_rate_limit(self) -> None:
+        """Pause admissions after the provider rejected a call."""
+        self.rate_limited += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + LLM_RATE_LIMIT_COOLDOWN_SECONDS)
+
+    def saturated(self) -> bool:
+        """True while calls are paused after a rate limit or the queue is backed up."""
+        return self.queue_depth >= LLM_SATURATION_QUEUE_DEPTH or self._paused_until > time.monotonic()
+
+    def stats(self) -> Dict:
+        return {
+            "saturated": self.saturated(),
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "avg_wait_seconds": self.total_wait_seconds / self.admitted if self.admitted else 0.0,
+            "max_wait_seconds": self.max_wait_seconds,
+            "requests_in_window": len(self._window),
+            "tokens_in_window": sum(entry[1] for entry in self._window)
+        }
+
+
+llm_scheduler = LLMScheduler()
+
+
+def _usage_tokens(message: Any) -> Optional[int]:
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return usage.get("total_tokens")
+    return None
+
+
+class ScheduledLLM:
+    """
+    Chat model wrapper that routes calls through an LLMScheduler.
+
+    Accepts any model exposing ainvoke/astream, so a local stub can stand in
+    for Gemini when exercising rate-limit handling.
+    """
+
+    def __init__(self, model: Any, scheduler: LLMScheduler = llm_scheduler):
+        self.model = model
+        self.scheduler = scheduler
+
+    def _retrying(self) -> AsyncRetrying:
+        return AsyncRetrying(
+            retry=retry_if_exception(is_retryable_error),
+            wait=wait_random_exponential(multiplier=0.5, max=20),
+            stop=stop_after_attempt(LLM_MAX_ATTEMPTS),
+            before_sleep=self._before_retry,
+            reraise=True
+        )
+
+    def _before_retry(self, retry_state) -> None:
+        self.scheduler.retries += 1
+
+    async def ainvoke(self, messages: Any, **kwargs) -> Any:
+        tokens = estimate_tokens(messages) + LLM_COMPLETION_TOKEN_ESTIMATE
+        async for attempt in self._retrying():
+            with attempt:
+                entry = await self.scheduler.acquire(tokens)
+                try:
+                    response = await self.model.ainvoke(messages, **kwargs)
+                except Exception as e:
+                    if is_rate_limit_error(e):
+                        self.scheduler.note_rate_limit()
+                    raise
+                self.scheduler.settle(entry, _usage_tokens(response))
+                return response
+
+    async def astream(self, messages: Any, **kwargs) -> AsyncIterator[Any]:
+        """Stream a response; failures are only retried before the first chunk arrives."""
+        tokens = estimate_tokens(messages) + LLM_COMPLETION_TOKEN_ESTIMATE
+        async for attempt in self._retrying():
+            with attempt:
+                entry = await self.scheduler.acquire(tokens)
+                stream = self.model.astream(messages, **kwargs)
+                try:
+                    first_chunk = await stream.__anext__()
+                except StopAsyncIteration:
+                    return
+                except Exception as e:
+                    if is_rate_limit_error(e):
+                        self.scheduler.note_rate_limit()
+                    raise
+
+        yield first_chunk
+        usage = _usage_tokens(first_chunk) or 0
+        async for chunk in stream:
+            usage += _usage_tokens(chunk) or 0
+            yield chunk
+        self.scheduler.settle(entry, usage)
+
+    def invoke(self, messages: Any, **kwargs) -> Any:
+        return self.model.invoke(messages, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.model, name)
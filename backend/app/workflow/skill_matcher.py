@@ -0,0 +1,155 @@
+"""
+Multi-pattern skill matching.
+
+SkillMatcher compiles a set of skills, together with their known synonyms
+(e.g. "k8s" for Kubernetes), into an Aho-Corasick automaton and finds every
+occurrence in a text in one pass. Matches must sit on word boundaries, so
+"Go" does not match "Google" while "C++" and ".NET" still match.
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+
+# Canonical skill name -> alternative spellings
+SKILL_SYNONYMS: Dict[str, List[str]] = {
+    "JavaScript": ["JS", "ECMAScript"],
+    "TypeScript": ["TS"],
+    "Kubernetes": ["k8s"],
+    "Go": ["Golang"],
+    "PostgreSQL": ["Postgres"],
+    "MongoDB": ["Mongo"],
+    "Node.js": ["NodeJS", "Node"],
+    "React": ["React.js", "ReactJS"],
+    "Vue.js": ["Vue", "VueJS"],
+    "C#": ["CSharp"],
+    "CI/CD": ["CICD", "Continuous Integration"],
+    "Amazon Web Services": ["AWS"],
+    "Google Cloud Platform": ["GCP", "Google Cloud"],
+    "Microsoft Azure": ["Azure"],
+    "Machine Learning": ["ML"],
+    "Artificial Intelligence": ["AI"],
+    "Natural Language Processing": ["NLP"],
+    "Large Language Models": ["LLM", "LLMs"],
+    "Scikit-learn": ["sklearn"],
+    "Communication": ["Communication skills"],
+    "Problem Solving": ["Problem-solving"],
+    "Teamwork": ["Team player", "Team work"],
+    "Collaboration": ["Collaborative"],
+    "Attention to Detail": ["Detail-oriented", "Detail oriented"],
+    "Mentoring": ["Mentorship"],
+}
+
+
+class SkillMatch(NamedTuple):
+    skill: str
+    start: int
+    end: int
+
+
+def normalize_skill(skill: str) -> str:
+    """Lower-case a skill and collapse its whitespace."""
+    return " ".join(skill.lower().split())
+
+
+def _build_aliases() -> Dict[str, Set[str]]:
+    groups: Dict[str, Set[str]] = {}
+    for canonical, aliases in SKILL_SYNONYMS.items():
+        group = {normalize_skill(canonical)} | {normalize_skill(alias) for alias in aliases}
+        for name in group:
+            groups.setdefault(name, set()).update(group)
+    return groups
+
+
+_ALIASES = _build_aliases()
+
+
+def _fold(ch: str) -> str:
+    if ch.isspace():
+        return " "
+    lowered = ch.lower()
+    # Keep offsets aligned with the original text
+    return lowered if len(lowered) == 1 else ch
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over a set of skills and their synonyms."""
+
+    def __init__(self, skills: Iterable[str]):
+        self.skills: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per state: (pattern length, skill) pairs ending there
+        self._output: List[List[Tuple[int, str]]] = [[]]
+
+        for skill in skills:
+            normalized = normalize_skill(skill)
+            if not normalized or skill in self.skills:
+                continue
+            self.skills.append(skill)
+            for pattern in _ALIASES.get(normalized, {normalized}):
+                self._add_pattern(pattern, skill)
+        self._build_failure_links()
+
+    def _add_pattern(self, pattern: str, skill: str) -> None:
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(pattern), skill))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def find_all(self, text: str) -> List[SkillMatch]:
+        """Return every word-bounded skill occurrence in text, in order of end offset."""
+        matches = []
+        state = 0
+        for index, raw in enumerate(text):
+            ch = _fold(raw)
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for length, skill in self._output[state]:
+                start = index - length + 1
+                if self._on_boundary(text, start, index + 1):
+                    matches.append(SkillMatch(skill, start, index + 1))
+        return matches
+
+    @staticmethod
+    def _on_boundary(text: str, start: int, end: int) -> bool:
+        # Only alphanumeric pattern edges need a boundary: "C++" may be followed by ","
+        if text[start].isalnum() and start > 0 and text[start - 1].isalnum():
+            return False
+        if text[end - 1].isalnum() and end < len(text) and text[end].isalnum():
+            return False
+        return True
+
+    def matched_skills(self, text: str) -> Set[str]:
+        """Return the skills found anywhere in text."""
+        return {match.skill for match in self.find_all(text)}
+
+
+@lru_cache(maxsize=256)
+def _cached_matcher(skills: Tuple[str, ...]) -> SkillMatcher:
+    return SkillMatcher(skills)
+
+
+def get_skill_matcher(skills: Iterable[str]) -> SkillMatcher:
+    """Return a compiled matcher for skills, reusing one built for the same list."""
+    return _cached_matcher(tuple(skills))
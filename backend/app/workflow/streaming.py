@@ -0,0 +1,149 @@
+"""
+Incremental streaming of structured agent output.
+
+Agents ask the model for a single JSON object. While it streams, the text is
+re-parsed as partial JSON and every top-level field (or list item) that has
+provably closed is forwarded through the progress callback as a "partial"
+event, so clients can render the first paragraph long before the whole
+object has been validated. Given the agent's output model, each closed field
+is also checked against its declared type and withheld if it violates it.
+"""
+
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Type, get_args, get_origin
+
+from langchain_core.utils.json import parse_json_markdown
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from ..metrics import record_llm_usage, stage_timer
+from .config import handle_callback
+
+# A field can only close when one of these characters arrives
+_CLOSING_CHARS = frozenset(",]}")
+
+
+@lru_cache(maxsize=None)
+def _field_adapter(model: Type[BaseModel], field: str, item: bool) -> TypeAdapter:
+    annotation = model.model_fields[field].annotation
+    if item and get_origin(annotation) in (list, List):
+        annotation = get_args(annotation)[0]
+    return TypeAdapter(annotation)
+
+
+def field_error(model: Type[BaseModel], field: str, value: Any, item: bool = False) -> Optional[str]:
+    """Return why value (or one list item of it) is invalid for a field of model, or None if it is valid or unknown."""
+    if field not in model.model_fields:
+        return None
+    try:
+        _field_adapter(model, field, item).validate_python(value)
+    except ValidationError as e:
+        return "; ".join(error["msg"] for error in e.errors())
+    return None
+
+
+class IncrementalJSONParser:
+    """Track a streaming JSON object and report fields as they complete."""
+
+    def __init__(self):
+        self.text = ""
+        self._emitted_fields = set()
+        self._emitted_items: Dict[str, int] = {}
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Append a chunk and return events for fields that closed because of it."""
+        self.text += chunk
+        if not _CLOSING_CHARS.intersection(chunk):
+            return []
+        return self._collect(final=False)
+
+    def close(self) -> List[Dict[str, Any]]:
+        """Return events for every field not yet reported once the stream has ended."""
+        return self._collect(final=True)
+
+    def _parse(self) -> Optional[Dict]:
+        try:
+            parsed = parse_json_markdown(self.text)
+        except Exception:
+            return None
+        return parsed if isinstance(parsed, dict) else None
+
+    def _collect(self, final: bool) -> List[Dict[str, Any]]:
+        parsed = self._parse()
+        if not parsed:
+            return []
+
+        events = []
+        keys = list(parsed)
+        for position, key in enumerate(keys):
+            if key in self._emitted_fields:
+                continue
+            value = parsed[key]
+            # Keys are streamed in order, so every key before the last has closed
+            closed = final or position < len(keys) - 1
+
+            if isinstance(value, list):
+                emitted = self._emitted_items.get(key, 0)
+                # While the list is still open its last item may be truncated
+                ready = len(value) if closed else max(len(value) - 1, 0)
+                for index in range(emitted, ready):
+                    events.append({"field": key, "index": index, "value": value[index]})
+                self._emitted_items[key] = max(emitted, ready)
+                if closed:
+                    self._emitted_fields.add(key)
+            elif closed:
+                events.append({"field": key, "value": value})
+                self._emitted_fields.add(key)
+
+        return events
+
+
+async def _forward(callback: Callable, agent: str, model: Optional[Type[BaseModel]], event: Dict[str, Any]) -> None:
+    if model is not None:
+        error = field_error(model, event["field"], event["value"], item="index" in event)
+        if error:
+            # Repaired after the stream ends; clients only ever see valid fields
+            print(f"Withheld invalid partial field [{agent}] {event['field']}: {error}")
+            return
+    await handle_callback(callback, {"status": "partial", "agent": agent, **event})
+
+
+async def stream_llm_response(llm, messages: List, callback: Optional[Callable], agent: str, model: Optional[Type[BaseModel]] = None) -> str:
+    """
+    Invoke the model, streaming completed JSON fields through the callback.
+
+    Falls back to a single non-streaming call when there is no callback to
+    forward partial output to.
+
+    Args:
+        llm: Chat model exposing ainvoke/astream
+        messages: Formatted prompt messages
+        callback: Optional progress callback
+        agent: Agent name attached to each partial event
+        model: Optional output model; fields that violate it are not forwarded
+
+    Returns:
+        Full text of the model response
+    """
+    with stage_timer("llm_call", agent):
+        if callback is None:
+            response = await llm.ainvoke(messages)
+            record_llm_usage(agent, getattr(response, "usage_metadata", None))
+            return response.content
+
+        parser = IncrementalJSONParser()
+        usage = {"input_tokens": 0, "output_tokens": 0}
+        async for chunk in llm.astream(messages):
+            # Chunk usage is incremental, as when AIMessageChunks are added together
+            for key, value in (getattr(chunk, "usage_metadata", None) or {}).items():
+                if key in usage:
+                    usage[key] += value
+            if not isinstance(chunk.content, str):
+                continue
+            for event in parser.feed(chunk.content):
+                await _forward(callback, agent, model, event)
+
+        for event in parser.close():
+            await _forward(callback, agent, model, event)
+
+        record_llm_usage(agent, usage)
+        return parser.text
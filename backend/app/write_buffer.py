@@ -0,0 +1,250 @@
+"""
+Write-behind buffering for MongoDB inserts.
+
+Documents get their ObjectId on the client, are acknowledged immediately and
+are written in the background with insert_many once WRITE_BUFFER_MAX_BATCH
+documents are pending or WRITE_BUFFER_FLUSH_SECONDS have passed. Failed
+batches are retried with backoff and, if the database stays unavailable,
+kept pending rather than dropped: the buffer reports itself as failing and
+add() stops acknowledging new documents once WRITE_BUFFER_MAX_PENDING are
+waiting. drain() flushes everything on shutdown and spills whatever still
+cannot be written to WRITE_BUFFER_SPILL_DIR, to be re-queued on the next
+start.
+"""
+
+import asyncio
+import os
+import tempfile
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from bson import json_util
+from pymongo.errors import BulkWriteError
+
+WRITE_BUFFER_MAX_BATCH = int(os.getenv("WRITE_BUFFER_MAX_BATCH", "100"))
+WRITE_BUFFER_FLUSH_SECONDS = float(os.getenv("WRITE_BUFFER_FLUSH_SECONDS", "0.5"))
+WRITE_BUFFER_MAX_ATTEMPTS = int(os.getenv("WRITE_BUFFER_MAX_ATTEMPTS", "5"))
+WRITE_BUFFER_MAX_PENDING = int(os.getenv("WRITE_BUFFER_MAX_PENDING", "10000"))
+WRITE_BUFFER_SPILL_DIR = os.getenv("WRITE_BUFFER_SPILL_DIR", os.path.join(tempfile.gettempdir(), "resume-agent-spill"))
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+class WriteBufferError(Exception):
+    """A batch could not be written after every attempt; its documents stay pending."""
+
+
+class WriteBehindBuffer:
+    """Batch documents in memory and insert them in the background."""
+
+    def __init__(
+        self,
+        insert_many: Callable[[List[Dict]], Awaitable],
+        name: str,
+        max_batch: int = WRITE_BUFFER_MAX_BATCH,
+        flush_seconds: float = WRITE_BUFFER_FLUSH_SECONDS,
+        max_attempts: int = WRITE_BUFFER_MAX_ATTEMPTS,
+        max_pending: int = WRITE_BUFFER_MAX_PENDING,
+        on_written: Optional[Callable[[List[Dict]], None]] = None
+    ):
+        self.insert_many = insert_many
+        self.name = name
+        self.on_written = on_written
+        # Buffers whose documents must be written before any of ours, such as
+        # the content blobs a result document references
+        self.dependencies: List["WriteBehindBuffer"] = []
+        self.max_batch = max_batch
+        self.flush_seconds = flush_seconds
+        self.max_attempts = max_attempts
+        self.max_pending = max_pending
+        self._pending: List[Dict] = []
+        self._in_flight: List[Dict] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+        self._spill_loaded = False
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.failed_flushes = 0
+        self.spilled = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def depth(self) -> int:
+        """Documents acknowledged but not yet written."""
+        return len(self._pending) + len(self._in_flight)
+
+    @property
+    def failing(self) -> bool:
+        """True while the last batch could not be written."""
+        return self.last_error is not None
+
+    @property
+    def spill_path(self) -> str:
+        return os.path.join(WRITE_BUFFER_SPILL_DIR, f"{self.name}.jsonl")
+
+    def _load_spill(self) -> None:
+        """Re-queue documents spilled by an earlier shutdown, ahead of new ones."""
+        self._spill_loaded = True
+        if not os.path.exists(self.spill_path):
+            return
+        with open(self.spill_path, encoding="utf-8") as f:
+            documents = [json_util.loads(line) for line in f if line.strip()]
+        os.remove(self.spill_path)
+        self._pending[:0] = documents
+        print(f"Write buffer {self.name} re-queued {len(documents)} spilled documents")
+
+    def _spill(self) -> None:
+        """Append every unwritten document to the spill file so it survives a restart."""
+        documents = self._in_flight + self._pending
+        if not documents:
+            return
+        os.makedirs(WRITE_BUFFER_SPILL_DIR, exist_ok=True)
+        with open(self.spill_path, "a", encoding="utf-8") as f:
+            for document in documents:
+                f.write(json_util.dumps(document) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.spilled += len(documents)
+        self._pending = []
+        print(f"Write buffer {self.name} spilled {len(documents)} unwritten documents to {self.spill_path}")
+
+    def start(self) -> None:
+        """Start the background writer (if needed), first re-queueing spilled documents."""
+        if not self._spill_loaded:
+            self._load_spill()
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def add(self, document: Dict) -> None:
+        """
+        Queue a document; only waits when the buffer is full.
+
+        Raises:
+            WriteBufferError: If the buffer is full and the database still
+                rejects writes, so the document cannot be acknowledged
+        """
+        self.start()
+        if self.depth >= self.max_pending:
+            # Backpressure: the writer is not keeping up
+            await self.flush()
+        self._pending.append(document)
+        if len(self._pending) >= self.max_batch:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                # Documents stay pending; the next cycle tries them again
+                print(f"Write buffer {self.name} flush error: {e}")
+
+    async def flush(self) -> None:
+        """
+        Write every pending document, one insert_many per batch.
+
+        Raises:
+            WriteBufferError: If a batch still fails after every attempt; it is
+                put back at the front of the queue
+        """
+        async with self._flush_lock:
+            if self._pending:
+                # Documents here may reference documents still queued in a dependency
+                for dependency in self.dependencies:
+                    if dependency.depth:
+                        await dependency.flush()
+            while self._pending:
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                self._in_flight = batch
+                try:
+                    unwritten = await self._write_batch(batch)
+                finally:
+                    self._in_flight = []
+                if unwritten:
+                    self._pending[:0] = unwritten
+                    raise WriteBufferError(f"{len(unwritten)} documents not written: {self.last_error}")
+
+    async def _write_batch(self, batch: List[Dict]) -> List[Dict]:
+        """Write a batch with retries; returns the documents that could not be written."""
+        original = batch
+        size = len(batch)
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                await self.insert_many(batch)
+                break
+            except BulkWriteError as e:
+                # Documents that already exist were written by an earlier attempt
+                failed = {
+                    error["index"] for error in e.details.get("writeErrors", [])
+                    if error.get("code") != DUPLICATE_KEY_ERROR
+                }
+                batch = [doc for index, doc in enumerate(batch) if index in failed]
+                if not batch:
+                    break
+                error = e
+            except Exception as e:
+                error = e
+            if attempt < self.max_attempts:
+                self.retries += 1
+                await asyncio.sleep(min(0.5 * 2 ** (attempt - 1), 10))
+        else:
+            self.written += size - len(batch)
+            self.failed_flushes += 1
+            self.last_error = str(error)
+            print(f"Write buffer {self.name} could not write {len(batch)} documents after {self.max_attempts} attempts: {error}")
+            unwritten = {id(doc) for doc in batch}
+            self._written([doc for doc in original if id(doc) not in unwritten])
+            return batch
+        self.written += size
+        self.batches += 1
+        self.last_error = None
+        self._written(original)
+        return []
+
+    def _written(self, documents: List[Dict]) -> None:
+        if documents and self.on_written is not None:
+            self.on_written(documents)
+
+    async def drain(self) -> None:
+        """Stop the background writer and flush everything still pending."""
+        if self._task is None:
+            return
+        # Let an in-progress flush finish rather than cancelling it mid-batch
+        self._stopping = True
+        self._wake.set()
+        await self._task
+        self._task = None
+        try:
+            await self.flush()
+        except WriteBufferError:
+            self._spill()
+
+    def find(self, document_id) -> Optional[Dict]:
+        """Return a pending document by _id, so reads can see acknowledged writes."""
+        for document in self._in_flight + self._pending:
+            if document.get("_id") == document_id:
+                return document
+        return None
+
+    def stats(self) -> Dict:
+        return {
+            "state": "failing" if self.failing else "ok",
+            "last_error": self.last_error,
+            "depth": self.depth,
+            "written": self.written,
+            "batches": self.batches,
+            "retries": self.retries,
+            "failed_flushes": self.failed_flushes,
+            "spilled": self.spilled
+        }
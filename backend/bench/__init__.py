@@ -0,0 +1,7 @@
+"""
+Offline load and latency benchmarks for the resume agent API.
+
+The benchmarks run the real FastAPI app and LangGraph workflow with every
+agent's model replaced by a deterministic stub, so throughput and tail
+latency can be measured without spending Gemini quota. See bench.run.
+"""
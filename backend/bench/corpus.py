@@ -0,0 +1,118 @@
+"""
+Sample inputs for the benchmarks.
+
+build_corpus renders synthetic one- to three-page resumes to PDF with
+reportlab from a seed, so every machine benchmarks the same documents
+without checking binaries into the repo. A directory of real PDFs can be
+used instead with load_corpus.
+"""
+
+import glob
+import os
+import random
+from typing import List
+
+FIRST_NAMES = ("Alex", "Priya", "Jordan", "Mei", "Samuel", "Fatima", "Lucas", "Ana")
+LAST_NAMES = ("Morgan", "Sharma", "Lee", "Chen", "Okafor", "Haddad", "Silva", "Novak")
+COMPANIES = ("Acme Corp", "Globex", "Initech", "Umbrella Health", "Stark Logistics", "Wayne Analytics")
+SKILLS = (
+    "Python", "FastAPI", "Django", "PostgreSQL", "Redis", "Docker", "Kubernetes", "Terraform", "AWS",
+    "TypeScript", "React", "GraphQL", "SQL", "Pandas", "PyTorch", "Airflow", "Kafka", "Git",
+)
+ACHIEVEMENTS = (
+    "Built {skill} services handling {n}k requests per second with p99 latency under 80 ms",
+    "Led the migration of {n} services to {skill}, cutting deploy time by {p}%",
+    "Designed a {skill} data pipeline processing {n} million events per day",
+    "Reduced infrastructure cost by {p}% by right-sizing {skill} workloads",
+    "Mentored {n} engineers and ran the team's {skill} design reviews",
+    "Introduced automated testing for {skill} code, raising coverage to {p}%",
+)
+
+JOB_DESCRIPTIONS = (
+    """Backend Engineer at Northwind Labs (Hybrid, Full-time)
+We are looking for a Backend Engineer to design and build REST APIs for our payments platform.
+Responsibilities:
+- Design and build Python services with FastAPI and PostgreSQL
+- Own services end to end, from design through on-call
+- Improve observability and reliability of production systems
+Requirements: 3+ years of experience, Docker, Kubernetes, Redis, strong communication skills.
+Bachelor's degree in Computer Science or equivalent experience.""",
+    """Senior Data Scientist - Bluepeak Analytics (Remote)
+Bluepeak Analytics is hiring a Senior Data Scientist to build forecasting models that drive inventory decisions.
+What you'll do:
+- Build and productionize machine learning models in Python and PyTorch
+- Orchestrate feature pipelines with Airflow and SQL
+- Present findings to leadership and partner with product managers
+Requirements: 5+ years of experience, Pandas, Scikit-learn, stakeholder management, a Master's degree in a quantitative field.""",
+    """Frontend Developer (Contract, On-site)
+Join our product team to build accessible, responsive user interfaces in TypeScript and React.
+Responsibilities:
+- Build features with React, Next.js and GraphQL
+- Collaborate with designers on the component library
+- Write unit and end-to-end tests with Jest
+Requirements: 1+ years of experience, CSS, attention to detail and teamwork.""",
+    """Platform Engineer - Stark Logistics
+Stark Logistics is looking for a Platform Engineer to run our Kubernetes and Terraform infrastructure on AWS.
+Key responsibilities:
+- Operate multi-region Kubernetes clusters and CI/CD pipelines
+- Automate infrastructure with Terraform and Python
+- Drive incident reviews and reliability improvements
+Requirements: 4+ years of experience with Linux, Docker, Kafka and strong problem solving skills. Full-time.""",
+)
+
+
+def _resume_lines(rng: random.Random) -> List[str]:
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    skills = rng.sample(SKILLS, 8)
+    lines = [name, f"{name.split()[0].lower()}@example.com | +1 555 010 {rng.randint(1000, 9999)}", ""]
+    lines += ["SUMMARY", f"Software engineer with {rng.randint(2, 12)} years of experience in {skills[0]} and {skills[1]}.", ""]
+    lines += ["EXPERIENCE"]
+    # Longer histories produce multi-page resumes
+    for job in range(rng.randint(2, 9)):
+        start = 2024 - 2 * (job + 1)
+        end = "Present" if job == 0 else str(start + 2)
+        lines.append(f"Software Engineer, {rng.choice(COMPANIES)} ({start} - {end})")
+        for _ in range(rng.randint(3, 6)):
+            achievement = rng.choice(ACHIEVEMENTS).format(skill=rng.choice(skills), n=rng.randint(2, 40), p=rng.randint(10, 70))
+            lines.append(f"- {achievement}")
+    lines += ["", "SKILLS", ", ".join(skills), ""]
+    lines += ["EDUCATION", f"B.Sc. Computer Science, State University ({2024 - rng.randint(4, 14)})"]
+    return lines
+
+
+def render_resume_pdf(path: str, lines: List[str]) -> None:
+    """Write resume text lines to a Letter-size PDF, breaking pages as needed."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    pdf = canvas.Canvas(path, pagesize=letter)
+    width, height = letter
+    y = height - 60
+    for line in lines:
+        if y < 60:
+            pdf.showPage()
+            y = height - 60
+        pdf.setFont("Helvetica-Bold" if line.isupper() else "Helvetica", 10)
+        pdf.drawString(60, y, line)
+        y -= 14
+    pdf.save()
+
+
+def build_corpus(directory: str, count: int = 8, seed: int = 0) -> List[str]:
+    """Render count synthetic resumes into directory and return their paths."""
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for index in range(count):
+        path = os.path.join(directory, f"resume_{index:03d}.pdf")
+        render_resume_pdf(path, _resume_lines(rng))
+        paths.append(path)
+    return paths
+
+
+def load_corpus(directory: str) -> List[str]:
+    """Return the PDFs in directory, sorted for a stable request order."""
+    paths = sorted(glob.glob(os.path.join(directory, "*.pdf")))
+    if not paths:
+        raise ValueError(f"No PDF files found in {directory}")
+    return paths
@@ -0,0 +1,332 @@
+"""
+Load test and latency benchmark with a deterministic stub LLM.
+
+From the backend directory:
+
+    python -m bench.run --clients 16 --requests 200
+    python -m bench.run --save-baseline bench/baseline.json
+    python -m bench.run --baseline bench/baseline.json
+
+The API is served by uvicorn inside this process with every agent's model
+replaced by a StubLLM (see bench.stub_llm), and concurrent clients post
+resumes from the corpus to /process-resume and read the SSE stream to the
+end. The report covers end-to-end latency and time to first event (p50,
+p95, p99), throughput and the process RSS. Comparing against a baseline
+exits non-zero when a metric is worse by more than --tolerance.
+
+Nothing is persisted by default (--db none); --db mongo includes MongoDB
+writes against MONGODB_URL, as the API would do them.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+# Metric path -> which direction is better, for baseline comparisons
+REGRESSION_CHECKS = (
+    ("latency_seconds.p50", "lower"),
+    ("latency_seconds.p95", "lower"),
+    ("latency_seconds.p99", "lower"),
+    ("ttfe_seconds.p50", "lower"),
+    ("ttfe_seconds.p95", "lower"),
+    ("throughput_rps", "higher"),
+    ("rss_mb.peak", "lower"),
+)
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Set configuration the app reads at import time; explicit environment values win."""
+    os.environ.setdefault("GOOGLE_API_KEY", "bench")
+    # The stub has no provider quota; only the scheduler's own overhead is measured
+    os.environ.setdefault("LLM_RPM", "1000000")
+    os.environ.setdefault("LLM_TPM", "1000000000")
+    if args.cold_cache:
+        # Every request runs the JD analyzer instead of reusing an earlier analysis
+        os.environ["JD_CACHE_MAX_ENTRIES"] = "0"
+        os.environ["NEAR_DUPLICATE_THRESHOLD"] = "2"
+
+
+def disable_persistence() -> None:
+    """Run without MongoDB: skip connecting and discard buffered writes."""
+    from app.content_store import content_store
+    from app.database import db_service
+    from app.jobs import job_queue
+
+    async def skip(*args, **kwargs):
+        return None
+
+    db_service.connect = skip
+    job_queue.setup = skip
+    db_service.write_buffer.insert_many = skip
+    for buffer in content_store.buffers.values():
+        buffer.insert_many = skip
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MiB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linearly interpolated percentile of values (0-100)."""
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "mean": sum(values) / len(values),
+        "max": max(values)
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _sample_rss(samples: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        samples.append(rss_mb())
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=0.1)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def one_request(client, url: str, pdf: bytes, filename: str, job_description: str, graph_mode: str) -> Dict:
+    """Post one resume and read its SSE stream to the end."""
+    start = time.perf_counter()
+    ttfe = None
+    last_event = None
+    try:
+        async with client.stream(
+            "POST", url,
+            files={"resume_file": (filename, pdf, "application/pdf")},
+            data={"job_description": job_description, "graph_mode": graph_mode}
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                return {"status": f"http_{response.status_code}", "latency": time.perf_counter() - start, "ttfe": None}
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                if ttfe is None:
+                    ttfe = time.perf_counter() - start
+                last_event = json.loads(line[6:])
+    except Exception as e:
+        return {"status": f"client_error: {type(e).__name__}", "latency": time.perf_counter() - start, "ttfe": ttfe}
+    status = last_event.get("status") if last_event else "no_events"
+    return {"status": status, "latency": time.perf_counter() - start, "ttfe": ttfe}
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    import httpx
+    import uvicorn
+
+    from app.main import app
+    from app.workflow.scheduler import llm_scheduler
+    from .corpus import JOB_DESCRIPTIONS, build_corpus, load_corpus
+    from .stub_llm import LatencyDistribution, StubProfile, install_stub_llms
+
+    # app.workflow.config turns LangSmith tracing on at import; the benchmark must stay offline
+    os.environ["LANGSMITH_TRACING"] = "false"
+    if args.db == "none":
+        disable_persistence()
+
+    profile = StubProfile(
+        latency=LatencyDistribution.parse(args.latency),
+        tokens_per_second=args.token_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        server_error_rate=args.server_error_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed
+    )
+    stubs = install_stub_llms(profile)
+
+    corpus_dir = args.corpus or os.path.join(tempfile.gettempdir(), f"careercraft-bench-corpus-{args.seed}")
+    paths = load_corpus(corpus_dir) if args.corpus else build_corpus(corpus_dir, args.corpus_size, args.seed)
+    documents = []
+    for path in paths:
+        with open(path, "rb") as f:
+            documents.append((os.path.basename(path), f.read()))
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        if serving.done():
+            serving.result()
+            raise RuntimeError("Server exited during startup")
+        await asyncio.sleep(0.05)
+
+    url = f"http://127.0.0.1:{port}/process-resume"
+    results: List[Dict] = []
+    next_index = 0
+    rss_samples = [rss_mb()]
+    stop_sampling = asyncio.Event()
+    sampler = asyncio.create_task(_sample_rss(rss_samples, stop_sampling))
+
+    async def client_loop(client) -> None:
+        nonlocal next_index
+        while next_index < args.requests:
+            index = next_index
+            next_index += 1
+            filename, pdf = documents[index % len(documents)]
+            job_description = JOB_DESCRIPTIONS[index % len(JOB_DESCRIPTIONS)]
+            results.append(await one_request(client, url, pdf, filename, job_description, args.graph_mode))
+
+    started = time.perf_counter()
+    try:
+        limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+        async with httpx.AsyncClient(timeout=None, limits=limits) as client:
+            await asyncio.gather(*(client_loop(client) for _ in range(args.clients)))
+        wall_seconds = time.perf_counter() - started
+    finally:
+        stop_sampling.set()
+        await sampler
+        server.should_exit = True
+        await serving
+
+    completed = [result for result in results if result["status"] == "completed"]
+    failures: Dict[str, int] = {}
+    for result in results:
+        if result["status"] != "completed":
+            failures[result["status"]] = failures.get(result["status"], 0) + 1
+
+    return {
+        "config": {
+            "clients": args.clients,
+            "requests": args.requests,
+            "graph_mode": args.graph_mode,
+            "latency": args.latency,
+            "token_rate": args.token_rate,
+            "rate_limit_rate": args.rate_limit_rate,
+            "server_error_rate": args.server_error_rate,
+            "malformed_rate": args.malformed_rate,
+            "cold_cache": args.cold_cache,
+            "db": args.db,
+            "corpus_size": len(documents),
+            "seed": args.seed
+        },
+        "completed": len(completed),
+        "failed": failures,
+        "wall_seconds": wall_seconds,
+        "throughput_rps": len(completed) / wall_seconds if wall_seconds else 0.0,
+        "latency_seconds": summarize([result["latency"] for result in completed]),
+        "ttfe_seconds": summarize([result["ttfe"] for result in results if result["ttfe"] is not None]),
+        "rss_mb": {"start": rss_samples[0], "peak": max(rss_samples), "end": rss_samples[-1]},
+        "llm": {
+            "calls": sum(stub.calls for stub in stubs.values()),
+            "injected_failures": sum(stub.failures for stub in stubs.values()),
+            "scheduler_retries": llm_scheduler.retries
+        }
+    }
+
+
+def _metric(report: Dict, path: str) -> Optional[float]:
+    value = report
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Describe every metric that is worse than the baseline by more than tolerance."""
+    regressions = []
+    for path, better in REGRESSION_CHECKS:
+        current, previous = _metric(report, path), _metric(baseline, path)
+        if current is None or not previous:
+            continue
+        change = (current - previous) / previous
+        if (better == "lower" and change > tolerance) or (better == "higher" and -change > tolerance):
+            regressions.append(f"{path}: {previous:.4g} -> {current:.4g} ({change:+.1%})")
+    return regressions
+
+
+def print_report(report: Dict) -> None:
+    print(f"Requests: {report['config']['requests']} with {report['config']['clients']} concurrent clients "
+          f"({report['completed']} completed, failures: {report['failed'] or 'none'})")
+    for name in ("latency_seconds", "ttfe_seconds"):
+        stats = report[name]
+        if stats:
+            print(f"{name:>16}: p50 {stats['p50']:.3f}  p95 {stats['p95']:.3f}  p99 {stats['p99']:.3f}  max {stats['max']:.3f}")
+    print(f"{'throughput':>16}: {report['throughput_rps']:.2f} req/s over {report['wall_seconds']:.1f}s")
+    rss = report["rss_mb"]
+    print(f"{'rss_mb':>16}: start {rss['start']:.1f}  peak {rss['peak']:.1f}  end {rss['end']:.1f}")
+    print(f"{'llm':>16}: {report['llm']['calls']} calls, {report['llm']['injected_failures']} injected failures, "
+          f"{report['llm']['scheduler_retries']} retries")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark /process-resume against a deterministic stub LLM")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent SSE clients")
+    parser.add_argument("--requests", type=int, default=50, help="Total requests across all clients")
+    parser.add_argument("--graph-mode", default="sequential", choices=("sequential", "parallel"))
+    parser.add_argument("--latency", default="lognormal:800,0.4",
+                        help="Stub time to first token in ms: fixed:MS, uniform:LOW,HIGH or lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--token-rate", type=float, default=80.0, help="Stub output tokens per second")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of stub calls failing with 429")
+    parser.add_argument("--server-error-rate", type=float, default=0.0, help="Share of stub calls failing with 503")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of stub outputs truncated mid-JSON")
+    parser.add_argument("--cold-cache", action="store_true", help="Disable job analysis reuse across requests")
+    parser.add_argument("--db", default="none", choices=("none", "mongo"))
+    parser.add_argument("--corpus", help="Directory of resume PDFs (default: generated synthetic resumes)")
+    parser.add_argument("--corpus-size", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    parser.add_argument("--save-baseline", help="Write the report as the baseline to this path")
+    parser.add_argument("--baseline", help="Compare against a saved baseline and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    report = asyncio.run(run(args))
+    print_report(report)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"Report written to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != report["config"]:
+            print("Warning: baseline was recorded with a different configuration")
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Deterministic stand-in for the Gemini chat model.
+
+StubLLM replays recorded JSON outputs (bench/fixtures/<agent>.json, each
+entry valid for the agent's Pydantic model) with a configurable
+time-to-first-token distribution, a fixed output token rate and injected
+failures: rate limits (429), server errors (503) and malformed JSON. All
+randomness comes from a seeded generator, so a run with the same settings
+makes the same choices.
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Characters per streamed token, matching the API's own token estimate
+CHARS_PER_TOKEN = 4
+TOKENS_PER_CHUNK = 8
+
+
+class StubServerError(Exception):
+    """Injected provider-side failure; retried by the scheduler like a real 5xx."""
+
+    code = 503
+
+
+class LatencyDistribution(NamedTuple):
+    """Time to first token, parsed from "fixed:MS", "uniform:LOW,HIGH" or "lognormal:MEDIAN,SIGMA"."""
+
+    kind: str
+    params: tuple
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        kind, _, values = spec.partition(":")
+        params = tuple(float(value) for value in values.split(",") if value)
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2}
+        if kind not in expected or len(params) != expected[kind]:
+            raise ValueError(f"Invalid latency distribution: {spec!r}")
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw a latency in seconds."""
+        if self.kind == "fixed":
+            milliseconds = self.params[0]
+        elif self.kind == "uniform":
+            milliseconds = rng.uniform(*self.params)
+        else:
+            median, sigma = self.params
+            milliseconds = rng.lognormvariate(math.log(median), sigma)
+        return milliseconds / 1000
+
+
+class StubProfile(NamedTuple):
+    latency: LatencyDistribution = LatencyDistribution("lognormal", (800.0, 0.4))
+    tokens_per_second: float = 80.0
+    rate_limit_rate: float = 0.0
+    server_error_rate: float = 0.0
+    malformed_rate: float = 0.0
+    seed: int = 0
+
+
+def load_fixtures(agent: str, directory: str = FIXTURES_DIR) -> List[Dict]:
+    """Load an agent's recorded outputs, checking each against the agent's output model."""
+    from app.workflow.models import CoverLetter, JobDescriptionAnalysis, TailoredResume
+
+    model = {
+        "jd_analyzer": JobDescriptionAnalysis,
+        "resume_tailor": TailoredResume,
+        "cover_letter_generator": CoverLetter,
+    }[agent]
+    with open(os.path.join(directory, f"{agent}.json"), encoding="utf-8") as f:
+        outputs = json.load(f)
+    for output in outputs:
+        model(**output)
+    return outputs
+
+
+class StubLLM:
+    """Chat model exposing ainvoke/astream/invoke, replaying fixtures for one agent."""
+
+    def __init__(self, agent: str, profile: StubProfile, outputs: Optional[List[Dict]] = None):
+        self.agent = agent
+        self.profile = profile
+        self.outputs = outputs if outputs is not None else load_fixtures(agent)
+        # Per-agent stream of choices, independent of how calls interleave across agents
+        self.rng = random.Random(f"{profile.seed}:{agent}")
+        self.calls = 0
+        self.failures = 0
+
+    @staticmethod
+    def _prompt_text(messages: Any) -> str:
+        return messages if isinstance(messages, str) else "".join(str(getattr(m, "content", m)) for m in messages)
+
+    @staticmethod
+    def _section_output(prompt: str) -> Optional[Dict]:
+        # Section-by-section tailoring asks for one section; echo it back as a TailoredSection
+        if "SECTION TITLE:" not in prompt or "SECTION CONTENT:\n" not in prompt:
+            return None
+        title = prompt.split("SECTION TITLE:", 1)[1].split("\n", 1)[0].strip()
+        content = prompt.split("SECTION CONTENT:\n", 1)[1].split("\n\nJOB ANALYSIS:", 1)[0]
+        return {"title": title, "content": content, "notes": [f"Reordered {title} to lead with relevant work"]}
+
+    def _next_response(self, messages: Any) -> str:
+        self.calls += 1
+        roll = self.rng.random()
+        if roll < self.profile.rate_limit_rate:
+            self.failures += 1
+            from app.workflow.scheduler import RateLimitError
+            raise RateLimitError("429 RESOURCE_EXHAUSTED (injected by stub)")
+        if roll < self.profile.rate_limit_rate + self.profile.server_error_rate:
+            self.failures += 1
+            raise StubServerError("503 Service Unavailable (injected by stub)")
+
+        output = self._section_output(self._prompt_text(messages)) if self.agent == "resume_tailor" else None
+        text = "```json\n" + json.dumps(output or self.rng.choice(self.outputs), indent=2) + "\n```"
+        if self.rng.random() < self.profile.malformed_rate:
+            # Cut the object off mid-way, as a truncated completion would be
+            text = text[:len(text) // 2]
+        return text
+
+    @staticmethod
+    def _usage(messages: Any, text: str) -> Dict[str, int]:
+        input_tokens = len(StubLLM._prompt_text(messages)) // CHARS_PER_TOKEN + 1
+        output_tokens = len(text) // CHARS_PER_TOKEN + 1
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+    async def ainvoke(self, messages: Any, **kwargs) -> AIMessage:
+        await asyncio.sleep(self.profile.latency.sample(self.rng))
+        text = self._next_response(messages)
+        await asyncio.sleep(len(text) / CHARS_PER_TOKEN / self.profile.tokens_per_second)
+        return AIMessage(content=text, usage_metadata=self._usage(messages, text))
+
+    async def astream(self, messages: Any, **kwargs) -> AsyncIterator[AIMessageChunk]:
+        await asyncio.sleep(self.profile.latency.sample(self.rng))
+        text = self._next_response(messages)
+        usage = self._usage(messages, text)
+        chunk_chars = CHARS_PER_TOKEN * TOKENS_PER_CHUNK
+        chunk_seconds = TOKENS_PER_CHUNK / self.profile.tokens_per_second
+        for start in range(0, len(text), chunk_chars):
+            if start:
+                await asyncio.sleep(chunk_seconds)
+            piece = text[start:start + chunk_chars]
+            # Input tokens are reported once; output tokens per chunk, as Gemini streams them
+            chunk_usage = {
+                "input_tokens": usage["input_tokens"] if start == 0 else 0,
+                "output_tokens": len(piece) // CHARS_PER_TOKEN,
+                "total_tokens": (usage["input_tokens"] if start == 0 else 0) + len(piece) // CHARS_PER_TOKEN,
+            }
+            yield AIMessageChunk(content=piece, usage_metadata=chunk_usage)
+
+    def invoke(self, messages: Any, **kwargs) -> AIMessage:
+        text = self._next_response(messages)
+        return AIMessage(content=text, usage_metadata=self._usage(messages, text))
+
+
+def install_stub_llms(profile: StubProfile, fixtures_dir: str = FIXTURES_DIR) -> Dict[str, StubLLM]:
+    """
+    Replace every agent's model with a StubLLM behind the real scheduler.
+
+    The workflow registry caches the clients create_llm builds, so seeding it
+    before the first run makes every agent use the stub while rate limiting,
+    retries and streaming still go through the production code paths.
+    """
+    from app.workflow import registry
+    from app.workflow.scheduler import ScheduledLLM, llm_scheduler
+
+    stubs = {}
+    for agent in registry.LLM_TEMPERATURES:
+        stubs[agent] = StubLLM(agent, profile, load_fixtures(agent, fixtures_dir))
+        registry._llms[agent] = ScheduledLLM(stubs[agent], llm_scheduler)
+    return stubs